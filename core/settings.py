@@ -6,6 +6,7 @@ from pathlib import Path
 from datetime import timedelta
 import os
 import dj_database_url
+import django_cache_url
 from environs import Env
 
 env = Env()
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so it times everything below; inactive unless PROPERTIES_INSTRUMENTATION is set.
+    'properties.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -83,8 +86,53 @@ WSGI_APPLICATION = 'core.wsgi.application'
 #         default=env('DATABASE_URL', default='sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3'))
 #     )
 # }
+# Workers keep their connection for DATABASE_CONN_MAX_AGE seconds (0 closes it
+# after every request) and check it still works before reusing it. Django
+# doesn't reuse persistent connections under ASGI: set it to 0 there, or use
+# DATABASE_POOL.
+DATABASE_CONNECTION = {
+    'conn_max_age': env.int('DATABASE_CONN_MAX_AGE', default=60),
+    'conn_health_checks': env.bool('DATABASE_CONN_HEALTH_CHECKS', default=True),
+}
+# DATABASE_POOL=true uses psycopg's connection pool on PostgreSQL instead
+# (requires the psycopg[pool] package); Django needs CONN_MAX_AGE=0 for it.
+DATABASE_POOL = env.bool('DATABASE_POOL', default=False)
+DATABASE_POOL_OPTIONS = {
+    'min_size': env.int('DATABASE_POOL_MIN_SIZE', default=1),
+    'max_size': env.int('DATABASE_POOL_MAX_SIZE', default=4),
+    'timeout': env.int('DATABASE_POOL_TIMEOUT', default=10),
+}
+
+
+def database_config(config):
+    if DATABASE_POOL and config.get('ENGINE') == 'django.db.backends.postgresql':
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = dict(DATABASE_POOL_OPTIONS)
+    return config
+
+
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
+    'default': database_config(dj_database_url.config(default=os.getenv('DATABASE_URL'), **DATABASE_CONNECTION))
+}
+
+# Optional read replicas (comma separated URLs). Safe requests to the property
+# API read from them, see properties.routers; tests mirror them to default.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica_{index}'] = {
+        **database_config(dj_database_url.parse(url, **DATABASE_CONNECTION)),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['properties.routers.ReplicaRouter']
+# Seconds a client keeps reading from the primary after it writes
+DATABASE_REPLICA_STICKY_SECONDS = env.int('DATABASE_REPLICA_STICKY_SECONDS', default=5)
+
+# Cache
+# Configured from CACHE_URL, e.g. locmem:// (default, single process only),
+# file:///var/tmp/django_cache or redis://host:6379/0 in production.
+CACHES = {
+    'default': django_cache_url.config(default='locmem://')
 }
 
 # Password validation
@@ -135,13 +183,22 @@ STATICFILES_FINDERS = [
 MEDIA_URL = '/media/'  # This can be kept for local development
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
-# Cloudinary settings
+# Cloudinary settings. Only needed once an image URL is built or a file is
+# uploaded (see properties.images.configure_cloudinary), not to start.
 CLOUDINARY_STORAGE = {
-    'CLOUD_NAME': env('CLOUDINARY_CLOUD_NAME'),
-    'API_KEY': env('CLOUDINARY_API_KEY'),
-    'API_SECRET': env('CLOUDINARY_API_SECRET'),
+    'CLOUD_NAME': env('CLOUDINARY_CLOUD_NAME', default=None),
+    'API_KEY': env('CLOUDINARY_API_KEY', default=None),
+    'API_SECRET': env('CLOUDINARY_API_SECRET', default=None),
 }
 
+# Property image uploads run on a bounded thread pool after the request commits.
+# Set PROPERTY_IMAGE_UPLOADS_ASYNC=False to upload inline, and
+# PROPERTY_IMAGE_UPLOADER=properties.uploads.LocalUploader to keep files on disk.
+PROPERTY_IMAGE_UPLOADS_ASYNC = env.bool('PROPERTY_IMAGE_UPLOADS_ASYNC', default=True)
+PROPERTY_IMAGE_UPLOAD_WORKERS = env.int('PROPERTY_IMAGE_UPLOAD_WORKERS', default=4)
+PROPERTY_IMAGE_UPLOADER = env('PROPERTY_IMAGE_UPLOADER', default='properties.uploads.CloudinaryUploader')
+PROPERTY_IMAGE_LOCAL_ROOT = env('PROPERTY_IMAGE_LOCAL_ROOT', default=str(BASE_DIR / 'property_images'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -155,6 +212,41 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Property listing pagination
+PROPERTIES_PAGE_SIZE = env.int('PROPERTIES_PAGE_SIZE', default=20)
+PROPERTIES_MAX_PAGE_SIZE = env.int('PROPERTIES_MAX_PAGE_SIZE', default=100)
+
+# Seconds a cached property API response is kept (writes invalidate it earlier)
+PROPERTIES_CACHE_TIMEOUT = env.int('PROPERTIES_CACHE_TIMEOUT', default=300)
+
+# Build list/detail GET responses from .values() rows instead of DRF
+# serializers, see properties.fastpath
+PROPERTIES_FAST_READS = env.bool('PROPERTIES_FAST_READS', default=True)
+
+# Largest number of properties accepted by one bulk import request
+PROPERTIES_BULK_MAX_ROWS = env.int('PROPERTIES_BULK_MAX_ROWS', default=10000)
+
+# Properties fetched (with their images, amenities and management) per export chunk
+PROPERTIES_EXPORT_CHUNK_SIZE = env.int('PROPERTIES_EXPORT_CHUNK_SIZE', default=2000)
+
+# Radius (km) used by ?near= when none is given, and the largest one accepted
+PROPERTIES_NEAR_DEFAULT_RADIUS_KM = env.float('PROPERTIES_NEAR_DEFAULT_RADIUS_KM', default=5)
+PROPERTIES_NEAR_MAX_RADIUS_KM = env.float('PROPERTIES_NEAR_MAX_RADIUS_KM', default=50)
+
+# Place names and coordinates used by the geocode_properties command
+PROPERTY_GAZETTEER_PATH = env('PROPERTY_GAZETTEER_PATH', default=str(BASE_DIR / 'properties' / 'data' / 'gazetteer.csv'))
+
+# Per-request instrumentation (Server-Timing headers, JSON request logs and
+# Prometheus metrics on /metrics), see properties.instrumentation
+PROPERTIES_INSTRUMENTATION = env.bool('PROPERTIES_INSTRUMENTATION', default=False)
+# Requests at least this slow have their SQL logged, for this fraction of them
+PROPERTIES_SLOW_REQUEST_MS = env.int('PROPERTIES_SLOW_REQUEST_MS', default=1000)
+PROPERTIES_SLOW_REQUEST_SAMPLE_RATE = env.float('PROPERTIES_SLOW_REQUEST_SAMPLE_RATE', default=0.1)
+# Seconds between a worker's metric flushes to the (shared) cache
+PROPERTIES_METRICS_FLUSH_SECONDS = env.float('PROPERTIES_METRICS_FLUSH_SECONDS', default=10)
+# Bearer token required by /metrics when set
+PROPERTIES_METRICS_TOKEN = env('PROPERTIES_METRICS_TOKEN', default='')
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
@@ -0,0 +1,38 @@
+"""
+Settings profile for API-only workers.
+
+Serves /api/properties/ without the admin, Jazzmin, Swagger docs, sessions,
+messages, static files and template machinery, so workers import less and
+start faster with a smaller footprint. Run the admin, migrations and
+collectstatic with the full core.settings.
+"""
+from core.settings import *  # noqa: F401,F403
+
+SLIM_EXCLUDED_APPS = {
+    'jazzmin',
+    'cloudinary',
+    'cloudinary_storage',
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'drf_yasg',
+}
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in SLIM_EXCLUDED_APPS]
+
+# The API authenticates with JWTs, so no session, CSRF or message handling.
+MIDDLEWARE = [
+    'properties.instrumentation.InstrumentationMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'core.urls_api'
+TEMPLATES = []
+
+# JSON only: the browsable API needs templates and static files.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from properties.instrumentation import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/properties/', include('properties.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
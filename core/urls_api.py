@@ -0,0 +1,11 @@
+"""
+URLs of the API-only profile (core.settings_api).
+"""
+from django.urls import include, path
+
+from properties.instrumentation import metrics_view
+
+urlpatterns = [
+    path('api/properties/', include('properties.urls')),
+    path('metrics', metrics_view, name='metrics'),
+]
@@ -0,0 +1,48 @@
+"""
+Gunicorn configuration, tuned through environment variables.
+
+WEB_CONCURRENCY                worker processes (default: 2 x CPUs + 1)
+GUNICORN_WORKER_CLASS          sync, gthread, or uvicorn.workers.UvicornWorker
+                               together with core.asgi:application (default: sync)
+GUNICORN_THREADS               threads per worker; more than 1 turns sync into gthread
+GUNICORN_PRELOAD               import Django once before forking (default: True)
+GUNICORN_MAX_REQUESTS          recycle a worker after this many requests, 0 to never
+GUNICORN_MAX_REQUESTS_JITTER   random extra requests, so workers don't recycle at once
+GUNICORN_KEEPALIVE             seconds to hold an idle keep-alive connection
+GUNICORN_TIMEOUT               seconds before a silent worker is killed and restarted
+GUNICORN_ACCESS_LOG            access log file, "-" for stdout (default: off)
+"""
+import os
+
+from environs import Env
+
+env = Env()
+env.read_env()
+
+
+def cpu_count():
+    # Honour CPU affinity (containers) where the platform exposes it.
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{env('PORT', '8000')}"
+workers = env.int('WEB_CONCURRENCY', default=cpu_count() * 2 + 1)
+worker_class = env('GUNICORN_WORKER_CLASS', default='sync')
+threads = env.int('GUNICORN_THREADS', default=1)
+preload_app = env.bool('GUNICORN_PRELOAD', default=True)
+max_requests = env.int('GUNICORN_MAX_REQUESTS', default=1000)
+max_requests_jitter = env.int('GUNICORN_MAX_REQUESTS_JITTER', default=100)
+keepalive = env.int('GUNICORN_KEEPALIVE', default=5)
+timeout = env.int('GUNICORN_TIMEOUT', default=30)
+graceful_timeout = timeout
+accesslog = env('GUNICORN_ACCESS_LOG', default=None)
+
+
+def post_fork(server, worker):
+    # With preload_app the master imported Django; make sure no database
+    # connection it may have opened is shared by the forked workers.
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
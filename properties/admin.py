@@ -1,20 +1,151 @@
+import json
+
 from django.contrib import admin
-from .models import Property, PropertyImage, Amenity, Management
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from .facets import BEDROOM_BUCKETS
+from .models import Property, PropertyImage, Amenity, AmenityType, Management
+from .search import MAX_QUERY_LENGTH, search_properties
+
+# Below this many rows the changelist shows an exact count.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` on PostgreSQL, else None.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Count large changelists from the query plan instead of a full ``COUNT(*)``.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) behind "N results (M total)".
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ('-pk',)
+
+
+class BedroomsFilter(admin.SimpleListFilter):
+    title = 'bedrooms'
+    parameter_name = 'bedrooms'
+
+    def lookups(self, request, model_admin):
+        last = BEDROOM_BUCKETS[-1]
+        return [(str(count), f'{count}+' if count == last else str(count)) for count in BEDROOM_BUCKETS]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        try:
+            bedrooms = int(self.value())
+        except ValueError:
+            raise IncorrectLookupParameters
+        lookup = 'bedrooms__gte' if bedrooms == BEDROOM_BUCKETS[-1] else 'bedrooms'
+        return queryset.filter(**{lookup: bedrooms})
 
 
 class PropertyImageInline(admin.TabularInline):
+    """
+    Existing images, shown as their stored thumbnails.
+    """
     model = PropertyImage
+    fields = ('preview', 'status')
+    readonly_fields = ('preview', 'status')
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Image')
+    def preview(self, image):
+        url = image.variants.get('thumb') or image.url
+        if not url:
+            return image.get_status_display()
+        return format_html('<img src="{}" width="100" loading="lazy" alt="">', url)
+
+
+class PropertyImageUploadInline(admin.TabularInline):
+    """
+    Upload slots for new images; existing ones are listed by PropertyImageInline.
+    """
+    model = PropertyImage
+    fields = ('image',)
     extra = 1
+    verbose_name_plural = 'Add images'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).none()
+
 
 class AmenityInline(admin.TabularInline):
     model = Amenity
     extra = 1
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'amenity_type':
+            # Load the (short) list of amenity types once, not once per row.
+            formfield.choices = [choice for choice in formfield.choices]
+        return formfield
+
+
 @admin.register(Property)
-class PropertyAdmin(admin.ModelAdmin):
-    inlines = [PropertyImageInline, AmenityInline]
+class PropertyAdmin(LargeTableAdmin):
+    inlines = [PropertyImageInline, PropertyImageUploadInline, AmenityInline]
     list_display = ('name', 'category', 'price', 'location')
+    # category and bedrooms lead indexes; both filters have fixed choices, so
+    # the sidebar runs no queries.
+    list_filter = ('category', BedroomsFilter)
+    # Searches go through the listing search (GIN indexed on PostgreSQL), see
+    # get_search_results; this only turns the search box and autocomplete on.
+    search_fields = ('name',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Write only the edited columns: the summary columns may have been
+        # refreshed (by a finishing background upload, say) since obj was loaded.
+        obj.save(update_fields=[*form.changed_data, 'updated_at'])
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()[:MAX_QUERY_LENGTH]
+        if not search_term:
+            return queryset, False
+        return search_properties(queryset, search_term), False
+
 
 @admin.register(Management)
-class ManagementAdmin(admin.ModelAdmin):
+class ManagementAdmin(LargeTableAdmin):
     list_display = ('property', 'name', 'type', 'contact')
+    list_select_related = ('property',)
+    list_filter = ('type',)
+    search_fields = ('name', 'contact')
+    autocomplete_fields = ('property',)
+
+
+@admin.register(AmenityType)
+class AmenityTypeAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
@@ -0,0 +1,83 @@
+"""
+Canonical amenity catalogue.
+
+Free-text amenity names are folded onto one ``AmenityType`` per amenity:
+case, spacing and punctuation are ignored and common variants ("Parking
+space", "car park") resolve to the canonical name ("Parking"). Names that
+are not known here become new types named as first written.
+"""
+from django.utils.text import slugify
+
+CANONICAL_NAMES = [
+    'Parking', 'Gym', 'Swimming Pool', 'Backup Generator', 'Borehole', 'CCTV',
+    'Lift', 'Balcony', 'Garden', 'Servant Quarters', 'Wi-Fi', 'Security',
+]
+ALIASES = {
+    'parking space': 'Parking',
+    'parking lot': 'Parking',
+    'car park': 'Parking',
+    'secure parking': 'Parking',
+    'covered parking': 'Parking',
+    'gymnasium': 'Gym',
+    'fitness centre': 'Gym',
+    'fitness center': 'Gym',
+    'pool': 'Swimming Pool',
+    'generator': 'Backup Generator',
+    'standby generator': 'Backup Generator',
+    'bore hole': 'Borehole',
+    'cctv cameras': 'CCTV',
+    'elevator': 'Lift',
+    'sq': 'Servant Quarters',
+    'dsq': 'Servant Quarters',
+    'servants quarters': 'Servant Quarters',
+    'wifi': 'Wi-Fi',
+    'internet': 'Wi-Fi',
+    'security guard': 'Security',
+    '24 hour security': 'Security',
+}
+
+
+def normalize(name):
+    for char in '-_/.,':
+        name = name.replace(char, ' ')
+    return ' '.join(name.lower().split())
+
+
+KNOWN_NAMES = {normalize(name): name for name in CANONICAL_NAMES}
+KNOWN_NAMES.update((normalize(alias), name) for alias, name in ALIASES.items())
+
+
+def canonical_amenity(name):
+    """
+    Return ``(slug, display name)`` for a free-text amenity name; the slug is
+    empty when the name has no letters or digits.
+    """
+    cleaned = ' '.join(name.split())
+    key = normalize(cleaned)
+    if key not in KNOWN_NAMES and key.endswith('s') and key[:-1] in KNOWN_NAMES:
+        key = key[:-1]
+    display = KNOWN_NAMES.get(key, cleaned)
+    return slugify(display), display
+
+
+def resolve_amenity_types(names):
+    """
+    Return ``{slug: AmenityType}`` for the distinct amenities in ``names``, in
+    order, creating missing types.
+    """
+    from .models import AmenityType
+
+    wanted = {}
+    for name in names:
+        slug, display = canonical_amenity(name)
+        wanted.setdefault(slug, display)
+    if not wanted:
+        return {}
+
+    types = {t.slug: t for t in AmenityType.objects.filter(slug__in=wanted)}
+    missing = [AmenityType(slug=slug, name=display) for slug, display in wanted.items() if slug not in types]
+    if missing:
+        # Concurrent writers may create the same types; the unique slug settles it.
+        AmenityType.objects.bulk_create(missing, ignore_conflicts=True)
+        types = {t.slug: t for t in AmenityType.objects.filter(slug__in=wanted)}
+    return {slug: types[slug] for slug in wanted}
@@ -0,0 +1,102 @@
+"""
+Async variants of the read-only property list and detail endpoints.
+
+They reuse the sync views for filtering, column selection, pagination and
+serialization, but run the queries through Django's async ORM (``aiterator``,
+``aget``) and the async cache API. Under an ASGI server a request waiting on
+the database or the cache then no longer holds a worker thread. Writes and
+conditional requests stay on the sync views.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+
+from .cache import response_cache_key
+from .fastpath import arepresent_properties, property_rows
+from .instrumentation import timed
+from .models import Property
+from .routers import is_pinned_to_primary, replica_reads
+from .views import PropertyDetailView, PropertyListCreateView
+
+
+def json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def api_exception_response(exc):
+    # Same body as DRF's default exception handler.
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+def async_read_view(view_class):
+    """
+    Turn ``handler(view, request, **kwargs)``, a coroutine returning response
+    data, into an async Django view.
+
+    ``view`` is an instance of the sync ``view_class`` set up the way DRF's
+    dispatch would; responses go through the same versioned cache.
+    """
+    def decorator(handler):
+        @require_safe
+        @wraps(handler)
+        async def view_func(request, **kwargs):
+            view = view_class(args=(), kwargs=kwargs, format_kwarg=None)
+            # With the view's authenticators, so a writer pinned to the primary is recognised.
+            request = view.request = view.initialize_request(request)
+            try:
+                # Authentication may look the user up, so it runs in a thread.
+                pinned = await sync_to_async(lambda: is_pinned_to_primary(request.user))()
+                with replica_reads(not pinned):
+                    key = await sync_to_async(response_cache_key)(
+                        request, view.get_cache_scope(), view.cache_key_params
+                    )
+                    with timed('cache'):
+                        data = await cache.aget(key)
+                    if data is None:
+                        data = await handler(view, request, **kwargs)
+                        if await sync_to_async(view.should_cache_response)():
+                            with timed('cache'):
+                                await cache.aset(key, data, settings.PROPERTIES_CACHE_TIMEOUT)
+            except APIException as exc:
+                return api_exception_response(exc)
+            return json_response(data)
+        return view_func
+    return decorator
+
+
+@async_read_view(PropertyListCreateView)
+async def property_list(view, request):
+    fields = view.get_fast_read_fields()
+    if fields is None:
+        queryset = view.filter_queryset(view.get_queryset())
+    else:
+        queryset = property_rows(view.filter_queryset(Property.objects.all()), fields)
+    paginator = view.paginator
+    queryset = paginator.get_page_queryset(queryset, request, view)
+    rows = [row async for row in queryset.aiterator(chunk_size=paginator.page_size + 1)]
+    page = paginator.paginate_rows(rows)
+    if fields is None:
+        data = view.get_serializer(page, many=True).data
+    else:
+        data = await arepresent_properties(page, fields, view.get_serializer_context())
+    return paginator.get_paginated_response(data).data
+
+
+@async_read_view(PropertyDetailView)
+async def property_detail(view, request, pk):
+    fields = view.get_fast_read_fields()
+    queryset = view.get_queryset() if fields is None else property_rows(Property.objects.all(), fields)
+    try:
+        prop = await queryset.aget(pk=pk)
+    except Property.DoesNotExist:
+        raise NotFound()
+    if fields is None:
+        return view.get_serializer(prop).data
+    return (await arepresent_properties([prop], fields, view.get_serializer_context()))[0]
@@ -0,0 +1,43 @@
+"""
+Small timing helpers shared by the benchmark management commands.
+"""
+import math
+import time
+
+
+def percentile(samples, pct):
+    """
+    Return the ``pct`` percentile of ``samples`` using the nearest-rank method.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """
+    Summarize latency samples (in seconds) as milliseconds.
+    """
+    return {
+        'runs': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def time_calls(func, runs, warmup=3):
+    """
+    Call ``func`` ``warmup + runs`` times and return the timed samples.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
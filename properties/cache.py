@@ -0,0 +1,104 @@
+"""
+Versioned response cache for the property API.
+
+Cached responses are keyed by the request plus a catalogue version counter.
+Any write to the catalogue bumps the counter (see ``properties.signals``), so
+stale entries are never read again and simply expire.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .instrumentation import timed
+
+VERSION_KEY = 'properties:catalogue-version'
+LAST_DELETION_KEY = 'properties:last-deletion'
+LAST_WRITE_KEY = 'properties:last-write'
+
+
+def get_catalogue_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a flushed cache never reuses an old version.
+        cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    cache.set(LAST_WRITE_KEY, time.time(), timeout=None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        if get_catalogue_version() is None:
+            # The cache stores nothing (CACHE_URL=dummy://).
+            return None
+        return cache.incr(VERSION_KEY)
+
+
+def mark_catalogue_deletion():
+    cache.set(LAST_DELETION_KEY, timezone.now(), timeout=None)
+
+
+def get_last_catalogue_deletion():
+    return cache.get(LAST_DELETION_KEY)
+
+
+def get_last_catalogue_write():
+    """
+    Return the Unix time of the latest catalogue write, if known.
+    """
+    return cache.get(LAST_WRITE_KEY)
+
+
+def response_cache_key(request, scope, params=None):
+    """
+    Build a cache key from the scheme, host, path and (sorted) query string,
+    restricted to the query parameters in ``params`` when given.
+    """
+    query = sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+        if params is None or key in params
+    )
+    signature = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.sha256(signature.encode()).hexdigest()
+    return f'properties:{scope}:{get_catalogue_version()}:{digest}'
+
+
+class CacheScopeMixin:
+    """
+    Hooks shared by ``CachedResponseMixin`` and ``ConditionalGetMixin``: the
+    scope their cache keys live under and whether to store an entry.
+    """
+    cache_scope = None
+
+    def get_cache_scope(self):
+        return self.cache_scope
+
+    def should_cache_response(self):
+        return True
+
+
+class CachedResponseMixin(CacheScopeMixin):
+    """
+    Serve successful GET responses of a view from the versioned cache.
+    """
+    # Query parameters that affect the response; None means all of them.
+    cache_key_params = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        with timed('cache'):
+            key = response_cache_key(request, self.get_cache_scope(), self.cache_key_params)
+            data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and self.should_cache_response():
+            with timed('cache'):
+                cache.set(key, response.data, settings.PROPERTIES_CACHE_TIMEOUT)
+        return response
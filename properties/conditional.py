@@ -0,0 +1,49 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for the property API.
+
+Validators come from ``Property.updated_at`` with a single aggregate query and
+are cached next to the response under the same catalogue version, so a
+client revalidating an unchanged resource costs no queries and no
+serialization.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import CacheScopeMixin, response_cache_key
+
+
+class ConditionalGetMixin(CacheScopeMixin):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 and tag 200 responses.
+
+    Views implement ``get_validators()`` returning ``(last_modified, token)``
+    or ``None`` when the resource has no validators (e.g. it does not exist).
+    """
+    def get_validators(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        key = response_cache_key(request, f'{self.get_cache_scope()}-validators')
+        validators = cache.get(key)
+        if validators is None:
+            validators = self.get_validators(request, *args, **kwargs)
+            if validators is None:
+                return handler(request, *args, **kwargs)
+            last_modified, token = validators
+            signature = f'{request.get_full_path()}|{last_modified.isoformat()}|{token}'
+            validators = (f'"{hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()}"', int(last_modified.timestamp()))
+            if self.should_cache_response():
+                cache.set(key, validators, settings.PROPERTIES_CACHE_TIMEOUT)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
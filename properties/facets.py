@@ -0,0 +1,75 @@
+"""
+Filter sidebar counts for the property listing.
+
+All property facets (total, category, bedrooms, price band) come from a
+single aggregate with one filtered ``COUNT`` per bucket; the top amenities
+take one more grouped query over the amenity through table.
+"""
+from django.db.models import Count, Q
+
+from .models import Amenity, Property
+
+# Lower bounds of the price bands; the last band is open-ended.
+PRICE_BANDS = [0, 10000, 25000, 50000, 100000, 250000]
+# Bedroom counts shown individually; the last one means "or more".
+BEDROOM_BUCKETS = [0, 1, 2, 3, 4, 5]
+TOP_AMENITIES = 10
+
+
+def price_bands():
+    for index, low in enumerate(PRICE_BANDS):
+        high = PRICE_BANDS[index + 1] - 1 if index + 1 < len(PRICE_BANDS) else None
+        yield low, high
+
+
+def compute_facets(queryset):
+    """
+    Return facet counts for the properties in ``queryset``.
+    """
+    aggregates = {'count': Count('pk')}
+    categories = [value for value, _ in Property.CATEGORY_CHOICES]
+    for index, category in enumerate(categories):
+        aggregates[f'category_{index}'] = Count('pk', filter=Q(category=category))
+    for bedrooms in BEDROOM_BUCKETS:
+        lookup = 'bedrooms__gte' if bedrooms == BEDROOM_BUCKETS[-1] else 'bedrooms'
+        aggregates[f'bedrooms_{bedrooms}'] = Count('pk', filter=Q(**{lookup: bedrooms}))
+    for index, (low, high) in enumerate(price_bands()):
+        band = Q(price__gte=low) if high is None else Q(price__gte=low, price__lte=high)
+        aggregates[f'price_{index}'] = Count('pk', filter=band)
+    totals = queryset.aggregate(**aggregates)
+
+    # Not folded into the aggregate above: which amenities make the top ten is
+    # only known after grouping by type, and joining the amenities there would
+    # multiply every property count by its number of amenities. The matching
+    # properties are a subquery, so this is still one more query, not one per
+    # amenity.
+    amenities = (
+        Amenity.objects.filter(property__in=queryset.values('pk'))
+        .values('amenity_type__slug', 'amenity_type__name')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'amenity_type__name')[:TOP_AMENITIES]
+    )
+
+    last_bedrooms = BEDROOM_BUCKETS[-1]
+    return {
+        'count': totals['count'],
+        'category': [
+            {'value': category, 'count': totals[f'category_{index}']}
+            for index, category in enumerate(categories)
+        ],
+        'bedrooms': [
+            {
+                'value': f'{bedrooms}+' if bedrooms == last_bedrooms else str(bedrooms),
+                'count': totals[f'bedrooms_{bedrooms}'],
+            }
+            for bedrooms in BEDROOM_BUCKETS
+        ],
+        'price': [
+            {'min_price': low, 'max_price': high, 'count': totals[f'price_{index}']}
+            for index, (low, high) in enumerate(price_bands())
+        ],
+        'amenities': [
+            {'slug': row['amenity_type__slug'], 'name': row['amenity_type__name'], 'count': row['count']}
+            for row in amenities
+        ],
+    }
@@ -0,0 +1,148 @@
+"""
+Read-only fast path for the property list and detail endpoints.
+
+Serializing a page with ``PropertySerializer(many=True)`` builds a model
+instance per row and per child row, then runs DRF's per-field dispatch
+(including the nested amenity and management serializers) for each one.
+Here the page is read with ``.values()`` and its ready images and amenities
+with one ``values_list()`` query each, grouped by property. Representations
+are then built by a getter per requested field, chosen once per request.
+
+The output is the same JSON as PropertySerializer / PropertyCardSerializer,
+field order included; the tests compare the two byte for byte. Serializers
+still decide which fields a request gets (``?fields=``, ``?expand=``,
+``?view=card``) and handle every write.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from .images import select_image_url
+from .instrumentation import timed
+from .models import Amenity, PropertyImage
+from .serializers import requested_image_size
+
+# Fields output exactly as stored in the Property column of the same name.
+COLUMN_FIELDS = {
+    'id', 'name', 'category', 'description', 'price', 'bedrooms', 'bathrooms', 'area', 'location',
+    'latitude', 'longitude', 'virtual_tour', 'image_count', 'amenity_count', 'management_type',
+}
+MANAGEMENT_COLUMNS = ('id', 'name', 'type', 'contact', 'photo_url', 'photo_variants')
+# Annotations added by the filters: ``?near=`` and ``?q=`` order by them.
+ANNOTATIONS = ('distance', 'search_rank')
+IMAGE_FIELDS = {'images', 'cover_image', 'management'}
+SUPPORTED_FIELDS = COLUMN_FIELDS | IMAGE_FIELDS | {'amenities'}
+
+
+def supports(fields):
+    """
+    Whether every one of ``fields`` can be built here; otherwise use the serializer.
+    """
+    return SUPPORTED_FIELDS.issuperset(fields)
+
+
+def property_rows(queryset, fields):
+    """
+    Return ``queryset`` as ``.values()`` rows holding what ``fields`` need.
+
+    The pagination keys (id, price, area) are always included. Apply filters
+    before this: annotating a ``.values()`` queryset groups by its columns.
+    """
+    columns = {'id', 'price', 'area'} | (COLUMN_FIELDS & set(fields))
+    if 'cover_image' in fields:
+        columns.update({'cover_image_url', 'cover_image_variants'})
+    if 'management' in fields:
+        columns.update(f'management__{column}' for column in MANAGEMENT_COLUMNS)
+    columns.update(name for name in ANNOTATIONS if name in queryset.query.annotations)
+    return queryset.values(*columns)
+
+
+def child_querysets(property_ids, fields):
+    """
+    Return ``{field: values_list queryset}`` for the child rows ``fields`` need.
+
+    Rows are ``(property_id, ...)`` in primary key order, as in the
+    serializers' prefetches.
+    """
+    querysets = {}
+    if 'images' in fields:
+        querysets['images'] = PropertyImage.objects.filter(
+            property_id__in=property_ids, status=PropertyImage.STATUS_READY
+        ).order_by('pk').values_list('property_id', 'url', 'variants')
+    if 'amenities' in fields:
+        querysets['amenities'] = Amenity.objects.filter(
+            property_id__in=property_ids
+        ).order_by('pk').values_list('property_id', 'amenity_type__name')
+    return querysets
+
+
+def represent_properties(rows, fields, context):
+    """
+    Return the representations of ``rows`` (from ``property_rows``).
+    """
+    property_ids = [row['id'] for row in rows]
+    children = {
+        name: list(queryset) for name, queryset in child_querysets(property_ids, fields).items()
+    } if rows else {}
+    return represent_rows(rows, children, fields, context)
+
+
+async def arepresent_properties(rows, fields, context):
+    """
+    Async ``represent_properties``.
+    """
+    property_ids = [row['id'] for row in rows]
+    children = {}
+    if rows:
+        for name, queryset in child_querysets(property_ids, fields).items():
+            children[name] = [child async for child in queryset]
+    return represent_rows(rows, children, fields, context)
+
+
+def represent_rows(rows, children, fields, context):
+    """
+    Build representations from property rows and their fetched child rows.
+    """
+    with timed('serialize'):
+        # Like the serializers, only validate ?image_size= when an image is output.
+        size = requested_image_size(context) if rows and IMAGE_FIELDS & set(fields) else None
+        grouped = {'images': defaultdict(list), 'amenities': defaultdict(list)}
+        for name, child_rows in children.items():
+            for property_id, *values in child_rows:
+                grouped[name][property_id].append(values)
+
+        getters = [(name, field_getter(name, size, grouped)) for name in fields]
+        results = []
+        for row in rows:
+            data = {name: get(row) for name, get in getters}
+            # As PropertySerializer.to_representation.
+            distance = row.get('distance')
+            if distance is not None:
+                data['distance_km'] = round(distance, 3)
+            results.append(data)
+        return results
+
+
+def field_getter(name, size, grouped):
+    """
+    Return a function computing field ``name`` from a property row.
+    """
+    if name in COLUMN_FIELDS:
+        return itemgetter(name)
+    if name == 'images':
+        images = grouped['images']
+        return lambda row: [select_image_url(url, variants, size) for url, variants in images.get(row['id'], ())]
+    if name == 'amenities':
+        amenities = grouped['amenities']
+        return lambda row: [{'name': values[0]} for values in amenities.get(row['id'], ())]
+    if name == 'management':
+        return lambda row: None if row['management__id'] is None else {
+            'name': row['management__name'],
+            'type': row['management__type'],
+            'contact': row['management__contact'],
+            'photo': select_image_url(row['management__photo_url'], row['management__photo_variants'], size) or None,
+        }
+    if name == 'cover_image':
+        # Grid cards default to the card-sized variant.
+        card_size = size or 'card'
+        return lambda row: select_image_url(row['cover_image_url'], row['cover_image_variants'], card_size) or None
+    raise ValueError(f'No fast path for the "{name}" field.')
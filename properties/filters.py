@@ -0,0 +1,162 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from . import geo
+from .amenities import canonical_amenity
+from .models import Amenity, Property
+from .search import MAX_QUERY_LENGTH, search_properties
+
+# Query parameter -> ORM lookup for the integer range filters.
+RANGE_FILTERS = {
+    'min_price': 'price__gte',
+    'max_price': 'price__lte',
+    'min_bedrooms': 'bedrooms__gte',
+    'min_bathrooms': 'bathrooms__gte',
+    'min_area': 'area__gte',
+    'max_area': 'area__lte',
+}
+# The range filtered columns are PositiveIntegerFields; a larger bound
+# overflows the database's integer type.
+MAX_RANGE_VALUE = 2147483647
+
+
+# Every query parameter read by filter_properties.
+FILTER_PARAMS = (
+    *RANGE_FILTERS, 'category', 'location', 'amenities', 'amenities_match', 'q', 'near', 'radius',
+)
+
+
+def filter_properties(queryset, params):
+    """
+    Apply the listing filters in ``params`` (a dict or QueryDict) to ``queryset``.
+
+    Raises ``ValidationError`` listing every malformed parameter.
+    """
+    lookups = {}
+    errors = {}
+
+    for param, lookup in RANGE_FILTERS.items():
+        value = params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            number = int(value)
+            if not 0 <= number <= MAX_RANGE_VALUE:
+                raise ValueError
+        except ValueError:
+            errors[param] = f'A valid integer between 0 and {MAX_RANGE_VALUE} is required.'
+            continue
+        lookups[lookup] = number
+
+    category = params.get('category')
+    if category:
+        categories = [c.strip() for c in category.split(',') if c.strip()]
+        valid = dict(Property.CATEGORY_CHOICES)
+        unknown = [c for c in categories if c not in valid]
+        if unknown:
+            errors['category'] = f'Unknown category: {", ".join(unknown)}.'
+        elif len(categories) == 1:
+            lookups['category'] = categories[0]
+        else:
+            lookups['category__in'] = categories
+
+    location = (params.get('location') or '').strip()
+    if location:
+        lookups['location__icontains'] = location
+
+    point, radius = parse_near(params, errors)
+    amenity_slugs, match_all = parse_amenities(params, errors)
+
+    query = (params.get('q') or '').strip()
+    if len(query) > MAX_QUERY_LENGTH:
+        errors['q'] = f'Search queries are limited to {MAX_QUERY_LENGTH} characters.'
+
+    if errors:
+        raise ValidationError(errors)
+    queryset = queryset.filter(**lookups)
+    if amenity_slugs:
+        queryset = filter_amenities(queryset, amenity_slugs, match_all)
+    if query:
+        queryset = search_properties(queryset, query)
+    if point is not None:
+        queryset = geo.near(queryset, *point, radius)
+    return queryset
+
+
+def parse_amenities(params, errors):
+    """
+    Parse ``amenities`` (comma separated, any spelling) and
+    ``amenities_match`` (``all`` or ``any``) into canonical slugs.
+    """
+    match = params.get('amenities_match') or 'all'
+    if match not in ('all', 'any'):
+        errors['amenities_match'] = 'Expected "all" or "any".'
+    names = [name.strip() for name in (params.get('amenities') or '').split(',') if name.strip()]
+    slugs = list(dict.fromkeys(canonical_amenity(name)[0] for name in names))
+    if '' in slugs:
+        errors['amenities'] = 'Amenity names must contain letters or digits.'
+    return slugs, match != 'any'
+
+
+def filter_amenities(queryset, slugs, match_all=True):
+    """
+    Keep properties with all (or any) of the amenity types in ``slugs``.
+
+    Each condition is a correlated EXISTS answered from the
+    (amenity_type, property) index of the through table.
+    """
+    def has(**lookup):
+        return Exists(Amenity.objects.filter(property=OuterRef('pk'), **lookup))
+
+    if not match_all:
+        return queryset.filter(has(amenity_type__slug__in=slugs))
+    for slug in slugs:
+        queryset = queryset.filter(has(amenity_type__slug=slug))
+    return queryset
+
+
+def parse_near(params, errors):
+    """
+    Parse ``near=lat,lng`` and ``radius`` (km), recording problems in ``errors``.
+    """
+    near, radius = params.get('near'), params.get('radius')
+    if not near:
+        if radius:
+            errors['radius'] = 'radius requires near.'
+        return None, None
+
+    try:
+        latitude, longitude = (float(part) for part in near.split(','))
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError
+        point = latitude, longitude
+    except ValueError:
+        errors['near'] = 'Expected "latitude,longitude" in decimal degrees.'
+        point = None
+
+    limit = settings.PROPERTIES_NEAR_MAX_RADIUS_KM
+    try:
+        radius = float(radius) if radius else settings.PROPERTIES_NEAR_DEFAULT_RADIUS_KM
+        if not 0 < radius <= limit:
+            raise ValueError
+    except ValueError:
+        errors['radius'] = f'A distance in kilometres greater than 0 and at most {limit:g} is required.'
+        return None, None
+    return point, radius
+
+
+class PropertyFilterBackend(BaseFilterBackend):
+    """
+    Server-side filtering for the property listing.
+
+    Supports ``min_price``/``max_price``, ``category`` (comma separated),
+    ``min_bedrooms``, ``min_bathrooms``, ``min_area``/``max_area``, a
+    case-insensitive ``location`` substring, ``amenities`` (all of them, or any
+    with ``amenities_match=any``), ``q`` full-text search and
+    ``near=lat,lng`` with an optional ``radius`` in kilometres.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_properties(queryset, request.query_params)
@@ -0,0 +1,162 @@
+"""
+Geohash helpers for "near me" listing queries without PostGIS.
+
+Each geocoded property stores the geohash of its coordinates in an indexed
+column. A radius query first picks a geohash precision whose cells are at
+least as large as the radius, so the circle is covered by the cell holding
+the centre and its eight neighbours, and turns those cells into index range
+scans; the exact great-circle distance is then computed in SQL for the few
+rows that survive.
+"""
+import csv
+import math
+
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """
+    Return the ``(latitude, longitude)`` span in degrees of a geohash cell.
+    """
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lng_bits
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def covering_precision(latitude, radius_km):
+    """
+    Return the longest precision whose cells are at least ``radius_km`` across at ``latitude``.
+    """
+    shrink = max(math.cos(math.radians(latitude)), 1e-6)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_span, lng_span = cell_size(precision)
+        if min(lat_span * KM_PER_DEGREE, lng_span * KM_PER_DEGREE * shrink) >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Return the geohash prefixes of the cell holding the point and its neighbours.
+    """
+    precision = covering_precision(latitude, radius_km)
+    lat_span, lng_span = cell_size(precision)
+    cells = set()
+    for dlat in (-lat_span, 0, lat_span):
+        lat = latitude + dlat
+        if not -90 <= lat <= 90:
+            continue
+        for dlng in (-lng_span, 0, lng_span):
+            lng = (longitude + dlng + 180) % 360 - 180
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def prefix_upper_bound(prefix):
+    """
+    Return the smallest geohash prefix sorting after every string starting
+    with ``prefix``, or None when there is none.
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def cell_filter(cells, field='geohash'):
+    """
+    Build a ``Q`` matching ``field`` values inside any of ``cells``.
+
+    Prefixes become ``>= / <`` ranges rather than ``LIKE 'prefix%'`` so that a
+    plain B-tree index serves them on every database; geohashes are lower-case
+    alphanumerics, which sort the same way under every collation.
+    """
+    condition = Q()
+    for cell in cells:
+        upper = prefix_upper_bound(cell)
+        bounds = {f'{field}__gte': cell}
+        if upper is not None:
+            bounds[f'{field}__lt'] = upper
+        condition |= Q(**bounds)
+    return condition
+
+
+def distance_expression(latitude, longitude):
+    """
+    Haversine distance in kilometres from the point to each row's coordinates.
+    """
+    lat, lng = math.radians(latitude), math.radians(longitude)
+    half_dlat = (Radians('latitude') - Value(lat)) / 2
+    half_dlng = (Radians('longitude') - Value(lng)) / 2
+    a = Power(Sin(half_dlat), 2) + Value(math.cos(lat)) * Cos(Radians('latitude')) * Power(Sin(half_dlng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a), output_field=FloatField())
+
+
+def near(queryset, latitude, longitude, radius_km):
+    """
+    Filter ``queryset`` to properties within ``radius_km`` of the point and
+    annotate ``distance`` in kilometres.
+    """
+    return queryset.filter(
+        cell_filter(covering_cells(latitude, longitude, radius_km))
+    ).annotate(
+        distance=distance_expression(latitude, longitude)
+    ).filter(distance__lte=radius_km)
+
+
+def load_gazetteer(path):
+    """
+    Read a ``name,latitude,longitude`` CSV into ``{normalized name: (lat, lng)}``.
+    """
+    with open(path, newline='', encoding='utf-8') as handle:
+        return {
+            normalize_place(row['name']): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(handle)
+        }
+
+
+def normalize_place(name):
+    return ' '.join(name.lower().replace(',', ' ').split())
+
+
+def geocode(location, gazetteer):
+    """
+    Return the coordinates of the longest gazetteer place named in
+    ``location``, or None.
+    """
+    text = f' {normalize_place(location)} '
+    best = None
+    for place, point in gazetteer.items():
+        if f' {place} ' in text and (best is None or len(place) > len(best[0])):
+            best = place, point
+    return best[1] if best else None
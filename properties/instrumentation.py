@@ -0,0 +1,268 @@
+"""
+Per-request performance instrumentation.
+
+With ``PROPERTIES_INSTRUMENTATION`` on, ``InstrumentationMiddleware`` records
+for every request the number and duration of SQL queries (through a database
+execute wrapper) and the time spent in phases marked with ``timed()`` by the
+views, serializers and Cloudinary helpers. It then
+
+* adds a ``Server-Timing`` header, shown by browser dev tools,
+* logs one JSON line per request to the ``properties.instrumentation`` logger,
+* logs the SQL of a sample of slow requests, and
+* adds the request to per-view Prometheus histograms served by
+  ``metrics_view``.
+
+Workers keep their counts in memory and add them to the Django cache every
+``PROPERTIES_METRICS_FLUSH_SECONDS``, so with a shared cache (Redis) the
+metrics endpoint reports every worker, whichever one answers the scrape.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# SQL statements kept per request for the slow request log.
+MAX_RECORDED_QUERIES = 100
+METRIC_TYPES = {
+    'properties_requests_total': 'counter',
+    'properties_request_duration_seconds': 'histogram',
+    'properties_request_queries_total': 'counter',
+    'properties_request_phase_seconds_total': 'counter',
+}
+SERIES_KEY = 'properties:metrics:series'
+
+_current = ContextVar('properties_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.query_count = 0
+        self.queries = []
+        # Phase name -> seconds; "db" is filled by the SQL recorder.
+        self.phases = defaultdict(float)
+
+    def add_query(self, sql, duration):
+        self.query_count += 1
+        self.phases['db'] += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((sql, duration))
+
+
+class timed:
+    """
+    Add the time spent in the block to ``phase`` of the current request.
+
+    A no-op outside instrumented requests.
+    """
+    __slots__ = ('phase', 'metrics', 'start')
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        self.metrics = _current.get()
+        if self.metrics is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.metrics is not None:
+            self.metrics.phases[self.phase] += time.perf_counter() - self.start
+
+
+def record_sql(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+def install_sql_recorder(connection, **kwargs):
+    # Connections are per thread and reconnect over time; wrap each one once.
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+def series(name, **labels):
+    """
+    Return the Prometheus series name, e.g. ``name{view="x",method="GET"}``.
+    """
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+class MetricsRegistry:
+    """
+    Per-process metric deltas, periodically added to the shared cache.
+
+    Seconds are counted in integer microseconds so ``cache.incr`` can add them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.last_flush = time.monotonic()
+
+    def observe(self, view, method, status, metrics, duration):
+        labels = {'view': view, 'method': method}
+        with self.lock:
+            self.pending[series('properties_requests_total', status=status, **labels)] += 1
+            self.pending[series('properties_request_queries_total', **labels)] += metrics.query_count
+            for phase, seconds in metrics.phases.items():
+                name = series('properties_request_phase_seconds_total', phase=phase, **labels)
+                self.pending[name] += int(seconds * 1_000_000)
+            for bound in DURATION_BUCKETS:
+                if duration <= bound:
+                    self.pending[series('properties_request_duration_seconds_bucket', le=bound, **labels)] += 1
+            self.pending[series('properties_request_duration_seconds_bucket', le='+Inf', **labels)] += 1
+            self.pending[series('properties_request_duration_seconds_count', **labels)] += 1
+            self.pending[series('properties_request_duration_seconds_sum', **labels)] += int(duration * 1_000_000)
+
+    def flush(self, force=False):
+        if not force and time.monotonic() - self.last_flush < settings.PROPERTIES_METRICS_FLUSH_SECONDS:
+            return
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(int)
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+
+        known = set(cache.get(SERIES_KEY) or ())
+        if not known.issuperset(pending):
+            # Racing workers may drop each other's additions; both re-add theirs next flush.
+            cache.set(SERIES_KEY, sorted(known.union(pending)), timeout=None)
+        for name, delta in pending.items():
+            key = f'properties:metrics:{name}'
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # The cache stores nothing (CACHE_URL=dummy://).
+                pass
+
+    def render(self):
+        """
+        Return every series in the Prometheus text exposition format.
+        """
+        self.flush(force=True)
+        names = cache.get(SERIES_KEY) or []
+        values = cache.get_many([f'properties:metrics:{name}' for name in names])
+        lines, typed = [], set()
+        for name in names:
+            value = values.get(f'properties:metrics:{name}')
+            if value is None:
+                continue
+            metric = name.split('{', 1)[0]
+            family = metric.rsplit('_', 1)[0] if metric.endswith(('_bucket', '_count', '_sum')) else metric
+            if family not in typed:
+                typed.add(family)
+                lines.append(f'# TYPE {family} {METRIC_TYPES.get(family, "untyped")}')
+            if metric.endswith(('_seconds_sum', '_seconds_total')):
+                value = value / 1_000_000
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    """
+    Time requests and their SQL; see the module docstring.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROPERTIES_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(install_sql_recorder, dispatch_uid='properties_sql_recorder')
+        for connection in connections.all(initialized_only=True):
+            install_sql_recorder(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+
+        timings = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in metrics.phases.items()]
+        timings.append(f'total;dur={duration * 1000:.2f}')
+        response['Server-Timing'] = ', '.join(timings) + f', queries;desc="{metrics.query_count} queries"'
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': metrics.query_count,
+            **{f'{phase}_ms': round(seconds * 1000, 2) for phase, seconds in metrics.phases.items()},
+        }
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
+        if (duration * 1000 >= settings.PROPERTIES_SLOW_REQUEST_MS
+                and random.random() < settings.PROPERTIES_SLOW_REQUEST_SAMPLE_RATE):
+            record['sql'] = [{'sql': sql, 'ms': round(seconds * 1000, 2)} for sql, seconds in metrics.queries]
+            logger.warning(json.dumps(record))
+
+        registry.observe(view, request.method, response.status_code, metrics, duration)
+        registry.flush()
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; send ``Authorization: Bearer <PROPERTIES_METRICS_TOKEN>`` when one is set.
+    """
+    if not settings.PROPERTIES_INSTRUMENTATION:
+        raise Http404
+    token = settings.PROPERTIES_METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4')
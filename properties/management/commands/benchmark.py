@@ -0,0 +1,136 @@
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from properties.benchmarks import summarize
+from properties.synthetic import generate_properties
+
+SCENARIOS = ['list', 'detail', 'filtered', 'create']
+# Listing queries front-ends run most, cycled through by the "filtered" scenario.
+FILTERS = [
+    {'category': 'Apartment', 'min_price': '20000', 'max_price': '80000'},
+    {'min_bedrooms': '3', 'ordering': '-price'},
+    {'location': 'Kilimani', 'amenities': 'parking'},
+    {'q': 'synthetic', 'max_price': '50000'},
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list, detail, filtered and create API calls on a synthetic catalogue and save the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Synthetic properties to generate')
+        parser.add_argument('--runs', type=int, default=200, help='Timed requests per scenario')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic catalogue')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help='Scenario to run (repeatable, default: all)')
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache on (default: off)')
+        parser.add_argument('--output', help='JSON file to write (default: benchmarks/<commit>-<database>.json)')
+        parser.add_argument('--compare', help='Earlier results file to print the p95 change against')
+
+    def handle(self, *args, **options):
+        # The seeded rows and everything created are rolled back at the end.
+        try:
+            with transaction.atomic():
+                if options['cache']:
+                    results = self.run(options)
+                else:
+                    with override_settings(
+                        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+                    ):
+                        results = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        report = {
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'rows': options['rows'],
+            'runs': options['runs'],
+            'seed': options['seed'],
+            'cache': options['cache'],
+            'results': results,
+        }
+        output = Path(options['output'] or f"benchmarks/{report['commit'] or 'unknown'}-{connection.vendor}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + '\n')
+
+        baseline = json.loads(Path(options['compare']).read_text())['results'] if options['compare'] else {}
+        header = f"\n{'scenario':<12}{'req/s':>10}{'p50':>11}{'p95':>11}{'p99':>11}"
+        self.stdout.write(header + (f"{'p95 change':>13}" if baseline else ''))
+        for name, stats in results.items():
+            line = (f"{name:<12}{stats['requests_per_second']:>10.1f}{stats['p50_ms']:>9.2f}ms"
+                    f"{stats['p95_ms']:>9.2f}ms{stats['p99_ms']:>9.2f}ms")
+            if name in baseline and baseline[name]['p95_ms']:
+                line += f"{(stats['p95_ms'] / baseline[name]['p95_ms'] - 1) * 100:>+12.1f}%"
+            self.stdout.write(line)
+        self.stdout.write(f'\nResults written to {output}')
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['rows']} properties on {connection.vendor}...")
+        ids = [prop.pk for prop in generate_properties(
+            options['rows'], images_per_property=None, amenities_per_property=None, seed=options['seed'],
+        )]
+        user = User.objects.create_superuser('benchmark', 'benchmark@example.com', None)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        list_url = reverse('properties:property-list-create')
+        requests = {
+            'list': lambda i: client.get(list_url),
+            'detail': lambda i: client.get(reverse('properties:property-detail', args=[ids[i * 7919 % len(ids)]])),
+            'filtered': lambda i: client.get(list_url, FILTERS[i % len(FILTERS)]),
+            'create': lambda i: client.post(list_url, {
+                'name': f'Benchmark Listing {i}', 'category': 'Apartment', 'description': 'Created by the benchmark.',
+                'price': 30000, 'bedrooms': 2, 'bathrooms': 1, 'area': 900, 'location': 'Kilimani',
+                'amenities': [{'name': 'Parking'}, {'name': 'Gym'}],
+                'management': {'name': 'Jane', 'type': 'Agent', 'contact': '0700000000'},
+            }, format='json'),
+        }
+        expected_status = {'create': 201}
+
+        results = {}
+        for name in options['scenario'] or SCENARIOS:
+            request = requests[name]
+            for i in range(min(5, options['runs'])):
+                request(i)
+            samples = []
+            start = time.perf_counter()
+            for i in range(options['runs']):
+                before = time.perf_counter()
+                response = request(i)
+                samples.append(time.perf_counter() - before)
+                if response.status_code != expected_status.get(name, 200):
+                    raise CommandError(f'{name} answered {response.status_code}: {response.content[:200]!r}')
+            elapsed = time.perf_counter() - start
+            results[name] = {**summarize(samples), 'requests_per_second': round(len(samples) / elapsed, 1)}
+        return results
@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from properties.benchmarks import summarize
+from properties.cache import bump_catalogue_version
+from properties.models import Property
+from properties.synthetic import generate_properties
+
+# (label, CONN_MAX_AGE, use psycopg's pool)
+MODES = [
+    ('new connection per request', 0, False),
+    ('persistent connections', 600, False),
+    ('connection pool', 0, True),
+]
+
+
+def pool_available():
+    if connection.vendor != 'postgresql':
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list endpoint throughput with per-request, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Synthetic properties to generate')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode')
+        parser.add_argument('--concurrency', type=int, default=4, help='Client threads')
+        parser.add_argument('--pool-size', type=int, default=4, help='Maximum pool size')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write('Connection setup is nearly free on SQLite; run this against PostgreSQL.')
+        # Connections are closed between requests, so the seeded rows have to be
+        # committed; they are deleted again at the end.
+        self.stdout.write(f"Seeding {options['rows']} properties...")
+        ids = [prop.pk for prop in generate_properties(options['rows'], images_per_property=1)]
+        original = {**connection.settings_dict, 'OPTIONS': dict(connection.settings_dict['OPTIONS'])}
+        try:
+            # Measure the database, not the response cache.
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+                self.run(options)
+        finally:
+            self.configure(original['CONN_MAX_AGE'], original['OPTIONS'])
+            Property.objects.filter(pk__in=ids).delete()
+            bump_catalogue_version()
+
+    def run(self, options):
+        url = reverse('properties:property-list-create')
+        self.stdout.write(f"\n{'mode':<30}{'req/s':>10}{'p50':>11}{'p95':>11}")
+        for label, max_age, pooled in MODES:
+            if pooled and not pool_available():
+                self.stdout.write(f'{label:<30}skipped, needs PostgreSQL and psycopg[pool]')
+                continue
+            options_dict = dict(connection.settings_dict['OPTIONS'])
+            options_dict.pop('pool', None)
+            if pooled:
+                options_dict['pool'] = {'min_size': 1, 'max_size': options['pool_size']}
+            self.configure(max_age, options_dict)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                batches = [options['requests'] // options['concurrency']] * options['concurrency']
+                samples = [sample for batch in executor.map(lambda n: self.client_thread(url, n), batches)
+                           for sample in batch]
+            elapsed = time.perf_counter() - start
+            stats = summarize(samples)
+            self.stdout.write(
+                f"{label:<30}{len(samples) / elapsed:>10.1f}{stats['p50_ms']:>9.2f}ms{stats['p95_ms']:>9.2f}ms"
+            )
+
+    def client_thread(self, url, count):
+        client = APIClient()
+        samples = []
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                # The test client skips the request_started/request_finished
+                # connection handling of the WSGI handler, so do it here.
+                close_old_connections()
+                response = client.get(url)
+                close_old_connections()
+                samples.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f'The list endpoint answered {response.status_code}.')
+        finally:
+            connections.close_all()
+        return samples
+
+    def configure(self, max_age, options):
+        """
+        Switch the default connection's persistence and pooling settings.
+        """
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.settings_dict['OPTIONS'] = options
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from properties.benchmarks import summarize, time_calls
+from properties.filters import filter_properties
+from properties.models import Property
+from properties.synthetic import generate_properties
+
+# (label, query parameters, ordering) for the listing queries front-ends run most.
+SCENARIOS = [
+    ('category + price range', {'category': 'Apartment', 'min_price': '50000', 'max_price': '150000'}, 'price'),
+    ('min bedrooms + price range', {'min_bedrooms': '3', 'max_price': '100000'}, 'price'),
+    ('area range', {'min_area': '1000', 'max_area': '1200'}, 'area'),
+    ('most expensive first', {}, '-price'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark filtered listing queries with and without the Property indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Synthetic properties to generate')
+        parser.add_argument('--runs', type=int, default=50, help='Timed runs per scenario')
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        # Everything, including the seeded rows and dropped indexes, is rolled back.
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['rows']} properties...")
+        generate_properties(options['rows'], images_per_property=0, amenities_per_property=0)
+        self.analyze()
+
+        with_indexes = self.measure(options)
+        self.drop_indexes()
+        self.analyze()
+        without_indexes = self.measure(options)
+
+        self.stdout.write(f"\n{'scenario':<30}{'indexed p95':>14}{'no index p95':>14}{'speedup':>10}")
+        for label, _, _ in SCENARIOS:
+            indexed = with_indexes[label]['p95_ms']
+            unindexed = without_indexes[label]['p95_ms']
+            speedup = unindexed / indexed if indexed else 0
+            self.stdout.write(f'{label:<30}{indexed:>12.2f}ms{unindexed:>12.2f}ms{speedup:>9.1f}x')
+
+    def measure(self, options):
+        results = {}
+        for label, params, ordering in SCENARIOS:
+            field = ordering.lstrip('-')
+            prefix = '-' if ordering.startswith('-') else ''
+            queryset = filter_properties(Property.objects.all(), params)
+            queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:options['page_size']]
+            results[label] = summarize(time_calls(lambda: list(queryset.all()), options['runs']))
+        return results
+
+    def drop_indexes(self):
+        template = connection.schema_editor().sql_delete_index
+        table = connection.ops.quote_name(Property._meta.db_table)
+        with connection.cursor() as cursor:
+            for index in Property._meta.indexes:
+                cursor.execute(template % {'name': connection.ops.quote_name(index.name), 'table': table})
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Property._meta.db_table}')
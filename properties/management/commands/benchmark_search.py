@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from properties.benchmarks import summarize, time_calls
+from properties.filters import filter_properties
+from properties.models import Property
+from properties.search import uses_full_text_search
+from properties.synthetic import generate_properties
+
+# (label, query parameters) for typical searches.
+SCENARIOS = [
+    ('single term', {'q': 'westlands'}),
+    ('rooms + location + amenity', {'q': '2 bedroom kilimani with parking'}),
+    ('amenity pair', {'q': 'gym swimming pool'}),
+    ('search + price filter', {'q': 'apartment lift', 'max_price': '100000'}),
+    ('no match', {'q': 'penthouse helipad'}),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ?q= search latency on a synthetic catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Synthetic properties to generate')
+        parser.add_argument('--runs', type=int, default=50, help='Timed runs per scenario')
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        # The seeded rows are rolled back when the benchmark finishes.
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        mode = 'tsvector + GIN' if uses_full_text_search() else 'substring fallback'
+        self.stdout.write(f"Seeding {options['rows']} properties ({connection.vendor}, {mode})...")
+        generate_properties(options['rows'], images_per_property=0)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Property._meta.db_table}')
+
+        self.stdout.write(f"\n{'scenario':<30}{'matches':>9}{'p50':>11}{'p95':>11}{'p99':>11}")
+        for label, params in SCENARIOS:
+            queryset = filter_properties(Property.objects.all(), params)
+            page = queryset.order_by('-search_rank', '-id')[:options['page_size']]
+            stats = summarize(time_calls(lambda: list(page.all()), options['runs']))
+            self.stdout.write(
+                f"{label:<30}{queryset.count():>9}{stats['p50_ms']:>9.2f}ms"
+                f"{stats['p95_ms']:>9.2f}ms{stats['p99_ms']:>9.2f}ms"
+            )
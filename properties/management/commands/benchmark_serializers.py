@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from properties.benchmarks import summarize, time_calls
+from properties.fastpath import property_rows, represent_properties
+from properties.models import Property
+from properties.serializers import PropertySerializer, amenities_prefetch, ready_images_prefetch
+from properties.synthetic import generate_properties
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare PropertySerializer(many=True) with the .values() fast path on 1k and 10k rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='1000,10000', help='Comma separated row counts')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per row count and path')
+
+    def handle(self, *args, **options):
+        # The seeded rows are rolled back.
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        sizes = [int(size) for size in options['rows'].split(',')]
+        self.stdout.write(f'Seeding {max(sizes)} properties...')
+        generate_properties(max(sizes), images_per_property=None, amenities_per_property=None)
+
+        fields = [name for name, field in PropertySerializer().fields.items() if not field.write_only]
+        # Both sides include fetching the rows, as a list page would.
+        self.stdout.write(f"\n{'rows':>7}{'serializer p50':>16}{'fast path p50':>15}{'speedup':>9}")
+        for size in sizes:
+            def serializer():
+                queryset = Property.objects.select_related('management').prefetch_related(
+                    ready_images_prefetch(), amenities_prefetch()
+                ).order_by('pk')[:size]
+                return PropertySerializer(queryset, many=True).data
+
+            def fast_path():
+                rows = list(property_rows(Property.objects.order_by('pk'), fields)[:size])
+                return represent_properties(rows, fields, {})
+
+            if serializer() != fast_path():
+                raise CommandError('The fast path output differs from PropertySerializer.')
+            slow = summarize(time_calls(serializer, options['runs'], warmup=1))
+            fast = summarize(time_calls(fast_path, options['runs'], warmup=1))
+            speedup = slow['p50_ms'] / fast['p50_ms'] if fast['p50_ms'] else 0
+            self.stdout.write(f"{size:>7}{slow['p50_ms']:>14.1f}ms{fast['p50_ms']:>13.1f}ms{speedup:>8.1f}x")
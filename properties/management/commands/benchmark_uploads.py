@@ -0,0 +1,78 @@
+import io
+import time
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from properties.benchmarks import summarize
+
+
+class SimulatedUploader:
+    """
+    Stand-in for Cloudinary that only sleeps for ``latency`` seconds.
+    """
+    latency = 0.2
+
+    def upload(self, name, content):
+        time.sleep(self.latency)
+        return f'image/upload/v1/benchmark/{name}'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark property creation latency against the number of uploaded photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--photos', default='1,5,15', help='Comma separated photo counts')
+        parser.add_argument('--latency', type=float, default=0.2, help='Simulated seconds per upload')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        SimulatedUploader.latency = options['latency']
+        counts = [int(count) for count in options['photos'].split(',')]
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64)).save(image, format='JPEG')
+        self.image = image.getvalue()
+
+        # Nothing written by the benchmark is kept.
+        try:
+            with transaction.atomic():
+                self.client = APIClient()
+                self.client.force_authenticate(User.objects.create_superuser('benchmark', 'b@example.com', 'x'))
+                self.run(counts, options['runs'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, counts, runs):
+        self.stdout.write(f"{'photos':>8}{'inline p50':>14}{'background p50':>18}")
+        uploader = f'{__name__}.SimulatedUploader'
+        for count in counts:
+            results = {}
+            for background in (False, True):
+                with override_settings(PROPERTY_IMAGE_UPLOADER=uploader, PROPERTY_IMAGE_UPLOADS_ASYNC=background):
+                    results[background] = summarize([self.create(count) for _ in range(runs)])
+            self.stdout.write(f"{count:>8}{results[False]['p50_ms']:>12.0f}ms{results[True]['p50_ms']:>16.0f}ms")
+
+    def create(self, count):
+        payload = {
+            'name': 'Benchmark listing', 'category': 'Apartment', 'description': 'Benchmark',
+            'price': 10000, 'bedrooms': 1, 'bathrooms': 1, 'area': 500, 'location': 'Kilimani',
+            'uploaded_images': [
+                SimpleUploadedFile(f'photo{i}.jpg', self.image, content_type='image/jpeg') for i in range(count)
+            ],
+        }
+        start = time.perf_counter()
+        response = self.client.post(reverse('properties:property-list-create'), payload, format='multipart')
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 201, response.data
+        return elapsed
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from properties.export import EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Stream the property catalogue as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, help='Properties fetched per chunk')
+
+    def handle(self, *args, **options):
+        chunks = iter_export(options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            # newline='' keeps the CSV writer's \r\n line endings intact.
+            with open(options['output'], 'w', encoding='utf-8', newline='') as handle:
+                handle.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
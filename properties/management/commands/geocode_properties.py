@@ -0,0 +1,53 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from properties.geo import geocode, load_gazetteer
+from properties.models import Property
+from properties.signals import bulk_catalogue_update
+
+
+class Command(BaseCommand):
+    help = 'Fill in property coordinates by matching locations against a local gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gazetteer', default=settings.PROPERTY_GAZETTEER_PATH,
+                            help='CSV file with name,latitude,longitude columns')
+        parser.add_argument('--all', action='store_true', help='Re-geocode properties that already have coordinates')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without saving them')
+
+    def handle(self, *args, **options):
+        gazetteer = load_gazetteer(options['gazetteer'])
+        queryset = Property.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(latitude__isnull=True)
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+        geocoded, unmatched = 0, Counter()
+        batch_size = options['batch_size']
+        with bulk_catalogue_update(), transaction.atomic():
+            for start in range(0, len(pks), batch_size):
+                batch = list(Property.objects.filter(pk__in=pks[start:start + batch_size]).only('pk', 'location'))
+                now = timezone.now()
+                changed = []
+                for prop in batch:
+                    point = geocode(prop.location, gazetteer)
+                    if point is None:
+                        unmatched[prop.location] += 1
+                        continue
+                    prop.latitude, prop.longitude = point
+                    prop.refresh_geohash()
+                    prop.updated_at = now
+                    changed.append(prop)
+                if not options['dry_run']:
+                    Property.objects.bulk_update(changed, ['latitude', 'longitude', 'geohash', 'updated_at'])
+                geocoded += len(changed)
+
+        verb = 'Would geocode' if options['dry_run'] else 'Geocoded'
+        self.stdout.write(f'{verb} {geocoded} of {len(pks)} properties.')
+        for location, count in unmatched.most_common(20):
+            self.stdout.write(f'  unmatched: {location!r} ({count})')
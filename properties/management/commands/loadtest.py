@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.benchmarks import summarize
+
+
+class Command(BaseCommand):
+    help = 'Load test running property API servers, e.g. a WSGI and an ASGI deployment side by side'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True, metavar='LABEL=URL',
+            help='Endpoint to load, e.g. wsgi=http://127.0.0.1:8000/api/properties/ (repeatable)',
+        )
+        parser.add_argument('--concurrency', default='10,50,100', help='Comma separated client counts')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per target and concurrency')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            label, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f'Expected LABEL=URL, got "{target}".')
+            targets.append((label, url))
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        self.stdout.write(
+            f"{'target':<12}{'clients':>8}{'req/s':>10}{'p50':>11}{'p95':>11}{'p99':>11}{'errors':>8}"
+        )
+        for label, url in targets:
+            for clients in levels:
+                samples, errors, elapsed = self.run(url, clients, options['duration'], options['timeout'])
+                stats = summarize(samples)
+                self.stdout.write(
+                    f"{label:<12}{clients:>8}{len(samples) / elapsed:>10.1f}{stats['p50_ms']:>9.1f}ms"
+                    f"{stats['p95_ms']:>9.1f}ms{stats['p99_ms']:>9.1f}ms{errors:>8}"
+                )
+
+    def run(self, url, clients, duration, timeout):
+        """
+        Hit ``url`` from ``clients`` keep-alive sessions for ``duration`` seconds.
+
+        Returns ``(latencies of successful requests, error count, elapsed seconds)``.
+        """
+        deadline = time.perf_counter() + duration
+        lock = threading.Lock()
+        samples, errors = [], [0]
+
+        def client():
+            with requests.Session() as session:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        ok = session.get(url, timeout=timeout).status_code == 200
+                    except requests.RequestException:
+                        ok = False
+                    latency = time.perf_counter() - start
+                    with lock:
+                        if ok:
+                            samples.append(latency)
+                        else:
+                            errors[0] += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            for _ in range(clients):
+                executor.submit(client)
+        return samples, errors[0], time.perf_counter() - start
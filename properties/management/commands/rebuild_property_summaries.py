@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.cache import bump_catalogue_version
+from properties.models import Property
+from properties.summaries import BATCH_SIZE, refresh_property_summaries, stale_summaries
+
+# Mismatches printed by --verify; the rest are only counted.
+MAX_REPORTED = 20
+
+
+class Command(BaseCommand):
+    help = 'Recompute the listing summary columns of every property, or check them with --verify'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Properties per UPDATE or check')
+        parser.add_argument('--verify', action='store_true',
+                            help='Only report properties whose summary is stale; exits non-zero if any are')
+
+    def handle(self, *args, **options):
+        processed, stale = 0, set()
+        for batch in self.batches(options['batch_size']):
+            if options['verify']:
+                for pk, field, stored, expected in stale_summaries(Property.objects.filter(pk__in=batch)):
+                    if len(stale) < MAX_REPORTED:
+                        self.stdout.write(f'Property {pk}: {field} is {stored!r}, expected {expected!r}')
+                    stale.add(pk)
+            else:
+                refresh_property_summaries(batch)
+            processed += len(batch)
+
+        if not options['verify']:
+            # Card responses are built from these columns.
+            bump_catalogue_version()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt the summaries of {processed} properties.'))
+        elif stale:
+            raise CommandError(f'{len(stale)} of {processed} properties have a stale summary.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'All {processed} property summaries are up to date.'))
+
+    def batches(self, size):
+        """
+        Yield lists of property ids in primary key order, seeking rather than offsetting.
+        """
+        last = 0
+        while True:
+            batch = list(Property.objects.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:size])
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
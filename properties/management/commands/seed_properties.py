@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property
+from properties.signals import bulk_catalogue_update
+from properties.synthetic import NAME_PREFIX, generate_properties
+
+
+class Command(BaseCommand):
+    help = 'Fill the catalogue with reproducible synthetic properties for local load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5000, help='Properties to generate')
+        parser.add_argument('--images', type=int, help='Images per property (default: a realistic spread)')
+        parser.add_argument('--amenities', type=int, help='Amenities per property (default: a realistic spread)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, the same seed gives the same data')
+        parser.add_argument('--replace', action='store_true',
+                            help='Delete previously generated properties first')
+
+    def handle(self, *args, **options):
+        if options['replace']:
+            with bulk_catalogue_update():
+                _, deleted = Property.objects.filter(name__startswith=f'{NAME_PREFIX} ').delete()
+            self.stdout.write(f'Deleted {deleted.get(Property._meta.label, 0)} synthetic properties.')
+
+        created = generate_properties(
+            options['count'],
+            images_per_property=options['images'],
+            amenities_per_property=options['amenities'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} synthetic properties.'))
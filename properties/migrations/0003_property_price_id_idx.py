@@ -0,0 +1,16 @@
+# Generated by Django 5.2 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0002_alter_management_photo_alter_propertyimage_image"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(fields=["price", "id"], name="property_price_id_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0005_property_timestamps"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="external_ref",
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0007_propertyimage_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="management",
+            name="photo_url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="management",
+            name="photo_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="propertyimage",
+            name="url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="propertyimage",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
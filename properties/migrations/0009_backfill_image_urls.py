@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-18 13:28
+
+import cloudinary
+from cloudinary.models import CloudinaryField
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations
+
+BATCH_SIZE = 1000
+# A frozen copy of properties.images as of this migration, so later changes to
+# the variants don't change the data it writes.
+IMAGE_VARIANTS = {
+    "thumb": {"width": 200, "height": 150, "crop": "fill", "quality": "auto", "fetch_format": "auto"},
+    "card": {"width": 640, "height": 427, "crop": "fill", "quality": "auto", "fetch_format": "auto"},
+    "full": {"width": 1600, "crop": "limit", "quality": "auto", "fetch_format": "auto"},
+}
+
+
+def configure_cloudinary():
+    credentials = {key.lower(): value for key, value in settings.CLOUDINARY_STORAGE.items() if value}
+    cloudinary.config(**credentials)
+    if not cloudinary.config().cloud_name:
+        raise ImproperlyConfigured("Set CLOUDINARY_CLOUD_NAME (or CLOUDINARY_URL) to backfill image URLs.")
+
+
+def build_image_urls(parser, value):
+    resource = parser.to_python(value)
+    variants = {name: resource.build_url(**options) for name, options in IMAGE_VARIANTS.items()}
+    return resource.url, variants
+
+
+def backfill(apps, schema_editor):
+    PropertyImage = apps.get_model("properties", "PropertyImage")
+    Management = apps.get_model("properties", "Management")
+
+    parser = CloudinaryField()
+    configured = False
+    for model, source, url_field, variants_field in (
+        (PropertyImage, "image", "url", "variants"),
+        (Management, "photo", "photo_url", "photo_variants"),
+    ):
+        pks = list(
+            model.objects.exclude(**{source: ""}).exclude(**{f"{source}__isnull": True}).values_list("pk", flat=True)
+        )
+        if pks and not configured:
+            configure_cloudinary()
+            configured = True
+        for start in range(0, len(pks), BATCH_SIZE):
+            batch = list(model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]))
+            for obj in batch:
+                url, variants = build_image_urls(parser, getattr(obj, source))
+                setattr(obj, url_field, url)
+                setattr(obj, variants_field, variants)
+            model.objects.bulk_update(batch, [url_field, variants_field])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0008_image_urls"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 13:35
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+INDEX_NAME = "property_search_vector_idx"
+
+# Mirrors properties.search.search_vector_expression() as of this migration.
+BACKFILL_SQL = """
+UPDATE properties_property AS p SET search_vector =
+    setweight(to_tsvector('english', coalesce(p.name, '') || ' ' || coalesce(p.location, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(p.category, '') || ' ' || p.bedrooms || ' bedroom '
+        || coalesce((SELECT string_agg(a.name, ' ') FROM properties_amenity AS a WHERE a.property_id = p.id), '')), 'B')
+    || setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # tsvector columns and GIN indexes only exist on PostgreSQL; elsewhere the
+    # column stays empty and search falls back to substring matching.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Property = apps.get_model("properties", "Property")
+    schema_editor.execute(BACKFILL_SQL)
+    schema_editor.add_index(Property, GinIndex(fields=["search_vector"], name=INDEX_NAME))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Property = apps.get_model("properties", "Property")
+    schema_editor.remove_index(Property, GinIndex(fields=["search_vector"], name=INDEX_NAME))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0009_backfill_image_urls"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0011_property_coordinates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AmenityType",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slug", models.SlugField(max_length=100, unique=True)),
+                ("name", models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="amenity",
+            name="amenity_type",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="amenities",
+                to="properties.amenitytype",
+            ),
+        ),
+    ]
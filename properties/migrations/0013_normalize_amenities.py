@@ -0,0 +1,97 @@
+# Generated by Django 5.2 on 2026-10-18 13:44
+
+from django.db import migrations
+from django.db.models import Count, Min
+from django.utils.text import slugify
+
+# A frozen copy of properties.amenities as of this migration, so later edits
+# to the catalogue don't change what it does.
+CANONICAL_NAMES = [
+    "Parking", "Gym", "Swimming Pool", "Backup Generator", "Borehole", "CCTV",
+    "Lift", "Balcony", "Garden", "Servant Quarters", "Wi-Fi", "Security",
+]
+ALIASES = {
+    "parking space": "Parking",
+    "parking lot": "Parking",
+    "car park": "Parking",
+    "secure parking": "Parking",
+    "covered parking": "Parking",
+    "gymnasium": "Gym",
+    "fitness centre": "Gym",
+    "fitness center": "Gym",
+    "pool": "Swimming Pool",
+    "generator": "Backup Generator",
+    "standby generator": "Backup Generator",
+    "bore hole": "Borehole",
+    "cctv cameras": "CCTV",
+    "elevator": "Lift",
+    "sq": "Servant Quarters",
+    "dsq": "Servant Quarters",
+    "servants quarters": "Servant Quarters",
+    "wifi": "Wi-Fi",
+    "internet": "Wi-Fi",
+    "security guard": "Security",
+    "24 hour security": "Security",
+}
+
+
+def normalize_name(name):
+    for char in "-_/.,":
+        name = name.replace(char, " ")
+    return " ".join(name.lower().split())
+
+
+KNOWN_NAMES = {normalize_name(name): name for name in CANONICAL_NAMES}
+KNOWN_NAMES.update((normalize_name(alias), name) for alias, name in ALIASES.items())
+
+
+def canonical_amenity(name):
+    cleaned = " ".join(name.split())
+    key = normalize_name(cleaned)
+    if key not in KNOWN_NAMES and key.endswith("s") and key[:-1] in KNOWN_NAMES:
+        key = key[:-1]
+    display = KNOWN_NAMES.get(key, cleaned)
+    return slugify(display), display
+
+
+def normalize(apps, schema_editor):
+    Amenity = apps.get_model("properties", "Amenity")
+    AmenityType = apps.get_model("properties", "AmenityType")
+
+    # The most common spelling of an amenity that is not in the canonical list
+    # becomes its display name.
+    spellings = Amenity.objects.values("name").annotate(rows=Count("pk")).order_by("-rows", "name")
+    names_by_slug, display_by_slug = {}, {}
+    for row in spellings:
+        slug, display = canonical_amenity(row["name"])
+        if not slug:
+            continue
+        names_by_slug.setdefault(slug, []).append(row["name"])
+        display_by_slug.setdefault(slug, display)
+
+    for slug, names in names_by_slug.items():
+        amenity_type, _ = AmenityType.objects.get_or_create(slug=slug, defaults={"name": display_by_slug[slug]})
+        Amenity.objects.filter(name__in=names).update(amenity_type=amenity_type)
+
+    # Names without a single letter or digit can't be mapped; drop them along
+    # with duplicate amenities of the same property.
+    Amenity.objects.filter(amenity_type__isnull=True).delete()
+    keep = Amenity.objects.values("property", "amenity_type").annotate(keep=Min("pk")).values_list("keep", flat=True)
+    Amenity.objects.exclude(pk__in=list(keep)).delete()
+
+
+def denormalize(apps, schema_editor):
+    Amenity = apps.get_model("properties", "Amenity")
+    AmenityType = apps.get_model("properties", "AmenityType")
+    for amenity_type in AmenityType.objects.all():
+        Amenity.objects.filter(amenity_type=amenity_type).update(name=amenity_type.name)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0012_amenity_type"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize, denormalize),
+    ]
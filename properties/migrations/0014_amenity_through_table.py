@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0013_normalize_amenities"),
+    ]
+
+    operations = [
+        # Gives the column back with a default when reversed, so existing rows
+        # survive until 0013's reverse fills the names in again.
+        migrations.AlterField(
+            model_name="amenity",
+            name="name",
+            field=models.CharField(default="", max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name="amenity",
+            name="name",
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="amenity_types",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="properties",
+                through="properties.Amenity",
+                to="properties.amenitytype",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="amenity",
+            name="amenity_type",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="amenities",
+                to="properties.amenitytype",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="amenity",
+            index=models.Index(
+                fields=["amenity_type", "property"], name="amenity_type_property_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="amenity",
+            constraint=models.UniqueConstraint(
+                fields=("property", "amenity_type"), name="amenity_property_type_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-18 14:29
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, JSONField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    # Mirrors properties.summaries.summary_expressions on the historical models.
+    Property = apps.get_model("properties", "Property")
+    PropertyImage = apps.get_model("properties", "PropertyImage")
+    Amenity = apps.get_model("properties", "Amenity")
+    Management = apps.get_model("properties", "Management")
+    db_alias = schema_editor.connection.alias
+
+    def count(queryset):
+        counts = queryset.order_by().values("property").annotate(count=Count("pk")).values("count")
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    ready = PropertyImage.objects.filter(property=OuterRef("pk"), status="ready")
+    cover = ready.order_by("pk")[:1]
+    summary = {
+        "cover_image_url": Coalesce(Subquery(cover.values("url")), Value("")),
+        "cover_image_variants": Coalesce(
+            Subquery(cover.values("variants"), output_field=JSONField()), Value({}, output_field=JSONField())
+        ),
+        "image_count": count(ready),
+        "amenity_count": count(Amenity.objects.filter(property=OuterRef("pk"))),
+        "management_type": Coalesce(
+            Subquery(Management.objects.filter(property=OuterRef("pk")).values("type")[:1]), Value("")
+        ),
+    }
+    pks = list(Property.objects.using(db_alias).values_list("pk", flat=True))
+    for start in range(0, len(pks), BATCH_SIZE):
+        Property.objects.using(db_alias).filter(pk__in=pks[start:start + BATCH_SIZE]).update(**summary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0014_amenity_through_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="amenity_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="cover_image_url",
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="cover_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="image_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="management_type",
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from cloudinary.models import CloudinaryField
 
+from . import geo
+from .images import build_image_urls
+
 
 class Property(models.Model):
     CATEGORY_CHOICES = [
@@ -11,6 +16,8 @@ class Property(models.Model):
         ('Apartment', 'Apartment'),
         ('House', 'House'),
     ]
+    # Maintained by properties.summaries; see PropertyAdmin.save_model.
+    SUMMARY_FIELDS = ('cover_image_url', 'cover_image_variants', 'image_count', 'amenity_count', 'management_type')
 
     name = models.CharField(max_length=200)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
@@ -21,27 +28,133 @@ class Property(models.Model):
     area = models.PositiveIntegerField(help_text="Area in square feet")
     location = models.CharField(max_length=200)
     virtual_tour = models.URLField(blank=True, null=True)
+    latitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    # Derived from latitude/longitude on save, see properties.geo.
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
+    # Identifier from the agent's own system, used to upsert bulk imports.
+    external_ref = models.CharField(max_length=100, unique=True, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Also bumped when images, amenities or management change (see properties.signals).
+    updated_at = models.DateTimeField(auto_now=True)
+    # Full-text document kept up to date by properties.search on PostgreSQL; its
+    # GIN index is created by migration 0010 there and the column stays empty elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Listing card summary of the images, amenities and management rows, see
+    # properties.summaries.
+    cover_image_url = models.URLField(max_length=500, blank=True, editable=False)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    image_count = models.PositiveIntegerField(default=0, editable=False)
+    amenity_count = models.PositiveIntegerField(default=0, editable=False)
+    management_type = models.CharField(max_length=20, blank=True, editable=False)
+    amenity_types = models.ManyToManyField(
+        'AmenityType', through='Amenity', related_name='properties', blank=True
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination seeks on (price, id) when listings are ordered by price.
+            models.Index(fields=['price', 'id'], name='property_price_id_idx'),
+            # Filtered listings: equality/range on the leading column, then price for
+            # the range or ordering that follows it.
+            models.Index(fields=['category', 'price'], name='property_category_price_idx'),
+            models.Index(fields=['bedrooms', 'price'], name='property_bedrooms_price_idx'),
+            models.Index(fields=['area', 'id'], name='property_area_id_idx'),
+            # "Near me" queries scan geohash prefix ranges.
+            models.Index(fields=['geohash'], name='property_geohash_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def refresh_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.refresh_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
 
 class PropertyImage(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     property = models.ForeignKey(Property, related_name='images', on_delete=models.CASCADE)
-    image = CloudinaryField('image')
+    # Empty until a background upload (see properties.uploads) has finished.
+    image = CloudinaryField('image', blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_READY)
+    # Derived from ``image`` on save, see properties.images.
+    url = models.URLField(max_length=500, blank=True)
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
-        return self.image.url
+        return self.url or f'{self.get_status_display()} image'
 
+    def refresh_urls(self):
+        self.url, self.variants = build_image_urls(self.image)
 
-class Amenity(models.Model):
-    property = models.ForeignKey(Property, related_name='amenities', on_delete=models.CASCADE)
+    def save(self, *args, **kwargs):
+        # Let CloudinaryField upload a pending file now so the URLs of the
+        # result are stored in the same write.
+        self._meta.get_field('image').pre_save(self, self._state.adding)
+        self.refresh_urls()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'image' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'url', 'variants'}
+        super().save(*args, **kwargs)
+
+
+class AmenityType(models.Model):
+    # Canonical amenity shared by every property that has it, see properties.amenities.
+    slug = models.SlugField(max_length=100, unique=True)
     name = models.CharField(max_length=100)
 
     def __str__(self):
         return self.name
 
 
+class AmenityManager(models.Manager):
+    def get_queryset(self):
+        # Amenities are always shown by their type's name.
+        return super().get_queryset().select_related('amenity_type')
+
+
+class Amenity(models.Model):
+    # Through table between Property and AmenityType.
+    property = models.ForeignKey(Property, related_name='amenities', on_delete=models.CASCADE)
+    amenity_type = models.ForeignKey(AmenityType, related_name='amenities', on_delete=models.PROTECT)
+
+    objects = AmenityManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'amenity_type'], name='amenity_property_type_uniq'),
+        ]
+        indexes = [
+            # ?amenities= filters look properties up by amenity type.
+            models.Index(fields=['amenity_type', 'property'], name='amenity_type_property_idx'),
+        ]
+
+    def __str__(self):
+        return self.amenity_type.name
+
+
 class Management(models.Model):
     TYPE_CHOICES = [
         ('Landlord', 'Landlord'),
@@ -54,6 +167,20 @@ class Management(models.Model):
     type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     contact = models.CharField(max_length=20)
     photo = CloudinaryField('photo')
+    # Derived from ``photo`` on save, see properties.images.
+    photo_url = models.URLField(max_length=500, blank=True)
+    photo_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
-        return f"{self.type}: {self.name}"
\ No newline at end of file
+        return f"{self.type}: {self.name}"
+
+    def refresh_urls(self):
+        self.photo_url, self.photo_variants = build_image_urls(self.photo)
+
+    def save(self, *args, **kwargs):
+        self._meta.get_field('photo').pre_save(self, self._state.adding)
+        self.refresh_urls()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'photo' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'photo_url', 'photo_variants'}
+        super().save(*args, **kwargs)
\ No newline at end of file
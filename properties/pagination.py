@@ -0,0 +1,166 @@
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple('Cursor', ['position', 'reverse'])
+
+
+class PropertyCursorPagination(BasePagination):
+    """
+    Keyset pagination over ``(<sort key>, id)``.
+
+    Every page is a range seek that starts right after the boundary row of the
+    previous page, so a page costs the same however deep the client has paged.
+    The ``next``/``previous`` links carry an opaque cursor holding the sort
+    field, and the sort key and id of that boundary row.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+    # Sort keys that are floats; every other one is an integer column.
+    float_fields = ('distance', 'search_rank')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.paginate_rows(list(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the ordered, seeked and sliced queryset for the requested page.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        ascending = self.descending == reverse
+        queryset = queryset.order_by(*self.get_order_by(ascending))
+        if self.cursor is not None:
+            queryset = self.seek(queryset, self.cursor.position, ascending)
+
+        # Fetch one extra row to find out whether there is a following page.
+        return queryset[:self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        return self.page
+
+    def get_page_size(self, request):
+        page_size = settings.PROPERTIES_PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested < 1:
+            return page_size
+        return min(requested, settings.PROPERTIES_MAX_PAGE_SIZE)
+
+    def get_ordering(self, request, view):
+        """
+        Return ``(field, descending)`` for the ``ordering`` query parameter,
+        restricted to the view's ``ordering_fields``.
+        """
+        ordering = request.query_params.get(self.ordering_query_param) or getattr(view, 'ordering', 'id')
+        field = ordering.lstrip('-')
+        allowed = getattr(view, 'ordering_fields', ('id',))
+        if field not in allowed:
+            raise ValidationError({
+                self.ordering_query_param: f'Cannot order by "{field}". Choose from: {", ".join(allowed)}.'
+            })
+        return field, ordering.startswith('-')
+
+    def get_order_by(self, ascending):
+        prefix = '' if ascending else '-'
+        if self.field == 'id':
+            return (f'{prefix}id',)
+        return (f'{prefix}{self.field}', f'{prefix}id')
+
+    def seek(self, queryset, position, ascending):
+        value, pk = position
+        gt, gte = ('gt', 'gte') if ascending else ('lt', 'lte')
+        if self.field == 'id':
+            return queryset.filter(**{f'id__{gt}': pk})
+        # The redundant ``>=`` bound lets the database turn the seek into a
+        # single index range scan on (field, id).
+        return queryset.filter(**{f'{self.field}__{gte}': value}).filter(
+            Q(**{f'{self.field}__{gt}': value}) | Q(**{f'id__{gt}': pk})
+        )
+
+    def get_position(self, instance):
+        if isinstance(instance, dict):
+            return instance[self.field], instance['id']
+        return getattr(instance, self.field), instance.pk
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            field, value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor issued for another ordering would seek on the wrong column.
+        if field != self.field or not self.is_valid_position(value, pk):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(position=(value, pk), reverse=bool(reverse))
+
+    def is_valid_position(self, value, pk):
+        types = (int, float) if self.field in self.float_fields else int
+        return (
+            isinstance(value, types) and not isinstance(value, bool) and math.isfinite(value)
+            and isinstance(pk, int) and not isinstance(pk, bool)
+        )
+
+    def encode_cursor(self, instance, reverse):
+        value, pk = self.get_position(instance)
+        payload = json.dumps([self.field, value, pk, int(reverse)], separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,103 @@
+"""
+Read-replica routing for the property API.
+
+Views using ``ReplicaReadMixin`` read from a random replica while handling a
+safe request; everything else (writes, admin, management commands) uses the
+primary. A client that has just written through the API is pinned to the
+primary for ``DATABASE_REPLICA_STICKY_SECONDS`` so it reads its own writes
+despite replication lag.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import get_last_catalogue_write
+
+_read_from_replica = ContextVar('properties_read_from_replica', default=False)
+
+
+def pin_key(user):
+    return f'properties:replica-pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    if settings.DATABASE_REPLICAS and settings.DATABASE_REPLICA_STICKY_SECONDS > 0:
+        cache.set(pin_key(user), True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and cache.get(pin_key(user), False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route reads made inside the block to the replicas (when ``enabled``).
+    """
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Route the reads of safe requests to the replicas, unless the client wrote recently.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        # initial() switches the replicas on once the user is known.
+        with replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(request.user):
+            _read_from_replica.set(True)
+
+    def reads_from_replica(self):
+        return _read_from_replica.get() and bool(settings.DATABASE_REPLICAS)
+
+    # Hooks of CacheScopeMixin.
+
+    def get_cache_scope(self):
+        scope = super().get_cache_scope()
+        # Keep possibly lagging replica responses away from clients pinned to the primary.
+        return f'{scope}:replica' if self.reads_from_replica() else scope
+
+    def should_cache_response(self):
+        if self.reads_from_replica():
+            last_write = get_last_catalogue_write()
+            if last_write is not None and time.time() - last_write < settings.DATABASE_REPLICA_STICKY_SECONDS:
+                # The replica may not have the latest write yet; don't keep its answer.
+                return False
+        return super().should_cache_response()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and request.user.is_authenticated:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
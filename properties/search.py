@@ -0,0 +1,109 @@
+"""
+Full-text search over the property catalogue.
+
+On PostgreSQL each property carries a weighted ``tsvector`` (name and location,
+then category, bedroom count and amenity names, then description) that is
+refreshed from Python whenever a property or its amenities change, and ``?q=``
+is matched against it with ``websearch_to_tsquery`` and ranked with
+``ts_rank``. Other databases fall back to matching every search term as a
+case-insensitive substring, which is enough for tests and local development.
+"""
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import (
+    Case, CharField, Exists, F, FloatField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Concat
+
+from .models import Amenity, Property
+
+SEARCH_CONFIG = 'english'
+MAX_QUERY_LENGTH = 200
+# Dropped by the fallback; the PostgreSQL configuration has its own list.
+STOPWORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'near', 'of', 'on', 'or', 'the', 'to', 'with'}
+
+
+def uses_full_text_search():
+    return connection.vendor == 'postgresql'
+
+
+def search_vector_expression():
+    amenity_names = Subquery(
+        Amenity.objects.filter(property=OuterRef('pk')).order_by().values('property')
+        .annotate(names=StringAgg('amenity_type__name', ' ')).values('names')
+    )
+    return (
+        SearchVector('name', 'location', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(
+            'category',
+            Concat(Cast('bedrooms', CharField()), Value(' bedroom')),
+            Coalesce(amenity_names, Value('')),
+            weight='B', config=SEARCH_CONFIG,
+        )
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(property_ids=None):
+    """
+    Recompute ``search_vector`` for ``property_ids`` (every property if None).
+
+    A no-op on databases without full-text search.
+    """
+    if not uses_full_text_search():
+        return
+    queryset = Property.objects.all()
+    if property_ids is not None:
+        queryset = queryset.filter(pk__in=list(property_ids))
+    queryset.update(search_vector=search_vector_expression())
+
+
+def search_terms(query):
+    terms = []
+    for word in re.findall(r'\w+', query.lower()):
+        if word in STOPWORDS:
+            continue
+        # Crude plural folding so "bedrooms" finds "2 bedroom".
+        if len(word) > 3 and word.endswith('s'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def search_properties(queryset, query):
+    """
+    Filter ``queryset`` to properties matching ``query`` and annotate
+    ``search_rank`` (higher is better).
+    """
+    if uses_full_text_search():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        # ts_rank returns a float4; widen it so the float a cursor stores
+        # compares equal to the rank it was read from.
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), search_query), FloatField())
+        )
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    queryset = queryset.alias(search_document=Concat(
+        'name', Value(' '), 'location', Value(' '), 'category', Value(' '),
+        Cast('bedrooms', CharField()), Value(' bedroom '), 'description',
+        output_field=CharField(),
+    ))
+    rank = Value(0.0)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(search_document__icontains=term)
+            | Exists(Amenity.objects.filter(property=OuterRef('pk'), amenity_type__name__icontains=term))
+        )
+        # Terms found in the name or location count double, like weight A above.
+        rank = rank + Case(
+            When(Q(name__icontains=term) | Q(location__icontains=term), then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+    return queryset.annotate(search_rank=rank)
@@ -1,5 +1,67 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from .amenities import canonical_amenity, resolve_amenity_types
+from .images import IMAGE_VARIANTS, select_image_url
+from .instrumentation import timed
 from .models import Property, PropertyImage, Amenity, Management
+from .search import refresh_search_vectors
+from .signals import bulk_catalogue_update
+from .summaries import refresh_property_summaries
+from .uploads import create_pending_images
+
+
+def requested_image_size(context):
+    """
+    Return the ``?image_size=`` variant requested by the client, if any.
+    """
+    request = context.get('request')
+    size = request.query_params.get('image_size') if request is not None else None
+    if not size:
+        return None
+    if size not in IMAGE_VARIANTS:
+        raise serializers.ValidationError({'image_size': f'Choose from: {", ".join(IMAGE_VARIANTS)}.'})
+    return size
+
+
+def validate_coordinates(attrs, instance=None):
+    latitude = attrs.get('latitude', getattr(instance, 'latitude', None))
+    longitude = attrs.get('longitude', getattr(instance, 'longitude', None))
+    if (latitude is None) != (longitude is None):
+        raise serializers.ValidationError('latitude and longitude must be given together.')
+    return attrs
+
+
+def split_param(value):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    On read requests, trim the output to ``?fields=`` (by default
+    ``default_fields``, or every readable field) plus anything named in
+    ``?expand=``.
+    """
+    default_fields = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        readable = [name for name, field in self.fields.items() if not field.write_only]
+        wanted = split_param(request.query_params.get('fields')) or self.default_fields or readable
+        wanted = set(wanted) | set(split_param(request.query_params.get('expand')))
+        unknown = wanted.difference(readable)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Unknown field(s): {", ".join(sorted(unknown))}. Choose from: {", ".join(readable)}.'
+            })
+        for name in list(self.fields):
+            if name not in wanted:
+                self.fields.pop(name)
 
 
 class PropertyImageSerializer(serializers.ModelSerializer):
@@ -8,14 +70,65 @@ class PropertyImageSerializer(serializers.ModelSerializer):
         fields = ['image']
 
     def to_representation(self, instance):
-        return instance.image.url  # Return just the URL string
+        return instance.url  # Return just the URL string
+
+
+class PropertyImageStatusSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PropertyImage
+        fields = ['id', 'status', 'url']
+
+    def get_url(self, obj):
+        return select_image_url(obj.url, obj.variants, requested_image_size(self.context)) or None
+
+
+class ReadyImageListField(serializers.ListField):
+    """
+    Image URLs of a property, leaving out uploads that are still pending or failed.
+    """
+
+    def get_attribute(self, instance):
+        size = requested_image_size(self.context)
+        return [
+            select_image_url(image.url, image.variants, size)
+            for image in super().get_attribute(instance)
+            if image.status == PropertyImage.STATUS_READY
+        ]
+
+
+def ready_images_prefetch():
+    """
+    Prefetch only the image rows and columns that ReadyImageListField reads.
+    """
+    return Prefetch(
+        'images',
+        queryset=PropertyImage.objects.filter(status=PropertyImage.STATUS_READY)
+        .only('id', 'property_id', 'status', 'url', 'variants').order_by('pk'),
+    )
+
+
+def amenities_prefetch():
+    """
+    Prefetch amenities in a stable (primary key) order.
+    """
+    return Prefetch('amenities', queryset=Amenity.objects.order_by('pk'))
 
 
 class AmenitySerializer(serializers.ModelSerializer):
+    # Any spelling is accepted on write; reads return the canonical name.
+    name = serializers.CharField(source='amenity_type.name', max_length=100)
+
     class Meta:
         model = Amenity
         fields = ['name']
 
+    def validate_name(self, value):
+        if not canonical_amenity(value)[0]:
+            raise serializers.ValidationError('Enter an amenity name containing letters or digits.')
+        return value
+
 
 class ManagementSerializer(serializers.ModelSerializer):
     photo = serializers.SerializerMethodField()
@@ -25,18 +138,26 @@ class ManagementSerializer(serializers.ModelSerializer):
         fields = ['name', 'type', 'contact', 'photo']
 
     def get_photo(self, obj):
-        if obj.photo:
-            return obj.photo.url  # Return full Cloudinary URL
-        return None
+        # Full Cloudinary URL (or the requested variant), precomputed on save
+        return select_image_url(obj.photo_url, obj.photo_variants, requested_image_size(self.context)) or None
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
 
-class PropertySerializer(serializers.ModelSerializer):
-    images = serializers.ListField(
+
+class PropertySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # On write, ``images`` is the list of existing image URLs to keep.
+    images = ReadyImageListField(
         child=serializers.URLField(),
         source='images.all',
-        read_only=True
+        required=False
     )
-    amenities = AmenitySerializer(many=True, read_only=True)
-    management = ManagementSerializer(read_only=True)
+    amenities = AmenitySerializer(many=True, required=False)
+    management = ManagementSerializer(required=False, allow_null=True)
     uploaded_images = serializers.ListField(
         child=serializers.ImageField(
             max_length=1000000,
@@ -51,28 +172,164 @@ class PropertySerializer(serializers.ModelSerializer):
         model = Property
         fields = [
             'id', 'name', 'category', 'description', 'price',
-            'bedrooms', 'bathrooms', 'area', 'location',
+            'bedrooms', 'bathrooms', 'area', 'location', 'latitude', 'longitude',
             'virtual_tour', 'images', 'amenities', 'management',
             'uploaded_images'
         ]
+        list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+    def validate(self, attrs):
+        return validate_coordinates(attrs, self.instance)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Set by ``?near=`` searches, see properties.geo.near.
+        distance = getattr(instance, 'distance', None)
+        if distance is not None:
+            data['distance_km'] = round(distance, 3)
+        return data
+
+    def pop_nested(self, validated_data):
+        kept_images = validated_data.pop('images', {}).get('all')
+        return {
+            'kept_images': kept_images,
+            'uploaded_images': validated_data.pop('uploaded_images', []),
+            'amenities': validated_data.pop('amenities', None),
+            'management': validated_data.pop('management', serializers.empty),
+        }
 
     def create(self, validated_data):
-        uploaded_images = validated_data.pop('uploaded_images', [])
-        amenities_data = validated_data.pop('amenities', [])
-        management_data = validated_data.pop('management', None)
+        nested = self.pop_nested(validated_data)
+
+        with bulk_catalogue_update(), transaction.atomic():
+            property = Property.objects.create(**validated_data)
+            self.sync_images(property, [], nested['uploaded_images'])
+            self.sync_amenities(property, nested['amenities'] or [])
+            if nested['management'] not in (None, serializers.empty):
+                self.sync_management(property, nested['management'])
+            refresh_search_vectors([property.pk])
+            refresh_property_summaries([property.pk])
+
+        return property
+
+    def update(self, instance, validated_data):
+        nested = self.pop_nested(validated_data)
+
+        with bulk_catalogue_update(), transaction.atomic():
+            instance = super().update(instance, validated_data)
+            self.sync_images(instance, nested['kept_images'], nested['uploaded_images'])
+            if nested['amenities'] is not None:
+                self.sync_amenities(instance, nested['amenities'])
+            if nested['management'] is not serializers.empty:
+                self.sync_management(instance, nested['management'])
+            refresh_search_vectors([instance.pk])
+            refresh_property_summaries([instance.pk])
+
+        return instance
+
+    # The sync_* helpers diff the requested children against the stored ones
+    # and issue at most one DELETE and one INSERT each, however many rows change.
+
+    def sync_images(self, property, kept_urls, uploaded_images):
+        if kept_urls is not None:
+            kept_urls = set(kept_urls)
+            # Clients may send back any variant they were given.
+            removed = [
+                image.pk for image in property.images.all()
+                if image.status == PropertyImage.STATUS_READY
+                and kept_urls.isdisjoint([image.url, *image.variants.values()])
+            ]
+            if removed:
+                PropertyImage.objects.filter(pk__in=removed).delete()
+        if uploaded_images:
+            # Uploads run in the background; the rows start out pending.
+            create_pending_images(property, uploaded_images)
+
+    def sync_amenities(self, property, amenities):
+        types = resolve_amenity_types(amenity['amenity_type']['name'] for amenity in amenities)
+        wanted = [amenity_type.pk for amenity_type in types.values()]
+        current = {amenity.amenity_type_id: amenity.pk for amenity in property.amenities.all()}
+        removed = [pk for type_id, pk in current.items() if type_id not in wanted]
+        if removed:
+            Amenity.objects.filter(pk__in=removed).delete()
+        added = [Amenity(property=property, amenity_type_id=type_id) for type_id in wanted if type_id not in current]
+        if added:
+            Amenity.objects.bulk_create(added)
+
+    def sync_management(self, property, data):
+        try:
+            management = property.management
+        except Management.DoesNotExist:
+            management = None
 
-        property = Property.objects.create(**validated_data)
+        if data is None:
+            if management is not None:
+                management.delete()
+                Property.management.related.delete_cached_value(property)
+        elif management is None:
+            # A partial update only validated the keys it sent; a new row needs them all.
+            serializer = ManagementSerializer(data=data)
+            if not serializer.is_valid():
+                raise serializers.ValidationError({'management': serializer.errors})
+            Management.objects.create(property=property, **serializer.validated_data)
+        else:
+            for attr, value in data.items():
+                setattr(management, attr, value)
+            management.save(update_fields=list(data))
 
-        # Create multiple property images
-        for image in uploaded_images:
-            PropertyImage.objects.create(property=property, image=image)
 
-        # Create amenities
-        for amenity in amenities_data:
-            Amenity.objects.create(property=property, **amenity)
+class PropertyCardSerializer(PropertySerializer):
+    """
+    Compact read-only listing card: the basics, one cover image and the
+    image and amenity counts, all read from the property row's summary
+    columns (see properties.summaries).
 
-        # Create management if data exists
-        if management_data:
-            Management.objects.create(property=property, **management_data)
+    ``images``, ``amenities``, ``management``, ``management_type`` and the
+    remaining fields can be added back with ``?expand=``.
+    """
+    cover_image = serializers.SerializerMethodField()
+    default_fields = ['id', 'name', 'price', 'location', 'category', 'cover_image', 'image_count', 'amenity_count']
+
+    class Meta(PropertySerializer.Meta):
+        fields = PropertySerializer.Meta.fields + ['cover_image', 'image_count', 'amenity_count', 'management_type']
+
+    def get_cover_image(self, obj):
+        # Grid cards default to the card-sized variant.
+        size = requested_image_size(self.context) or 'card'
+        return select_image_url(obj.cover_image_url, obj.cover_image_variants, size) or None
+
+
+class ManagementImportSerializer(serializers.ModelSerializer):
+    photo = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+    class Meta:
+        model = Management
+        fields = ['name', 'type', 'contact', 'photo']
+
+
+class PropertyImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk import. Rows are written by
+    ``properties.bulk.import_properties``, never through ``save()``.
+    """
+    # Declared explicitly so DRF does not add a per-row uniqueness query;
+    # references are checked for the whole batch at once.
+    external_ref = serializers.CharField(max_length=100, required=False, allow_null=True)
+    amenities = AmenitySerializer(many=True, required=False)
+    management = ManagementImportSerializer(required=False, allow_null=True)
+
+    class Meta:
+        model = Property
+        fields = [
+            'external_ref', 'name', 'category', 'description', 'price',
+            'bedrooms', 'bathrooms', 'area', 'location', 'latitude', 'longitude',
+            'virtual_tour', 'amenities', 'management'
+        ]
 
-        return property
\ No newline at end of file
+    def validate(self, attrs):
+        return validate_coordinates(attrs)
@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .cache import bump_catalogue_version, mark_catalogue_deletion
+from .models import Amenity, AmenityType, Management, Property, PropertyImage
+from .search import refresh_search_vectors
+from .summaries import refresh_property_summaries
+
+_bulk_write = ContextVar('properties_bulk_write', default=False)
+
+
+@contextmanager
+def bulk_catalogue_update():
+    """
+    Skip the per-row catalogue handlers below while writing in bulk.
+
+    The caller is responsible for setting ``updated_at`` and refreshing the
+    summaries of the rows it touches; the catalogue version is bumped once
+    on exit.
+    """
+    token = _bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_write.reset(token)
+        bump_catalogue_version()
+
+
+def invalidate_catalogue(sender, **kwargs):
+    if not _bulk_write.get():
+        bump_catalogue_version()
+
+
+def record_property_deletion(sender, **kwargs):
+    # Deletions leave no updated_at behind, so listing Last-Modified needs this.
+    mark_catalogue_deletion()
+
+
+def touch_property(sender, instance, **kwargs):
+    # Bump updated_at and refresh the listing summary in one UPDATE.
+    if not _bulk_write.get():
+        refresh_property_summaries([instance.property_id], updated_at=timezone.now())
+
+
+def refresh_new_property_summary(sender, instance, created, **kwargs):
+    # A new row may be a copy of another property, summary columns included.
+    if created and not _bulk_write.get():
+        refresh_property_summaries([instance.pk])
+
+
+def touch_amenity_type_properties(sender, instance, **kwargs):
+    # A renamed type changes the amenities (and search text) of every property that has it.
+    if _bulk_write.get():
+        return
+    property_ids = list(instance.amenities.values_list('property_id', flat=True))
+    if property_ids:
+        Property.objects.filter(pk__in=property_ids).update(updated_at=timezone.now())
+        refresh_search_vectors(property_ids)
+
+
+def refresh_search_vector(sender, instance, **kwargs):
+    # Bulk writers refresh the vectors of the rows they touched themselves.
+    if not _bulk_write.get():
+        refresh_search_vectors([instance.pk if sender is Property else instance.property_id])
+
+
+for model in (Property, PropertyImage, Amenity, AmenityType, Management):
+    post_save.connect(invalidate_catalogue, sender=model)
+    post_delete.connect(invalidate_catalogue, sender=model)
+
+post_delete.connect(record_property_deletion, sender=Property)
+
+for model in (PropertyImage, Amenity, Management):
+    post_save.connect(touch_property, sender=model)
+    post_delete.connect(touch_property, sender=model)
+
+post_save.connect(touch_amenity_type_properties, sender=AmenityType)
+post_delete.connect(touch_amenity_type_properties, sender=AmenityType)
+
+post_save.connect(refresh_new_property_summary, sender=Property)
+post_save.connect(refresh_search_vector, sender=Property)
+for signal in (post_save, post_delete):
+    signal.connect(refresh_search_vector, sender=Amenity)
@@ -0,0 +1,65 @@
+"""
+Listing summary columns on Property.
+
+A listing card needs the cover image, the image and amenity counts and the
+management type. These are copied onto the property row so cards are
+served from the property table alone. Saving or deleting an image, amenity
+or management row refreshes its property (see properties.signals); bulk
+writers call ``refresh_property_summaries`` for the rows they touched.
+``manage.py rebuild_property_summaries`` recomputes or verifies them all.
+"""
+from django.db.models import Count, IntegerField, JSONField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Amenity, Management, Property, PropertyImage
+
+BATCH_SIZE = 1000
+
+
+def count_per_property(queryset):
+    counts = queryset.order_by().values('property').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def summary_expressions():
+    """
+    Return ``{summary field: expression computing it}`` for Property querysets.
+    """
+    ready = PropertyImage.objects.filter(property=OuterRef('pk'), status=PropertyImage.STATUS_READY)
+    # The first ready image, as in ready_images_prefetch().
+    cover = ready.order_by('pk')[:1]
+    management = Management.objects.filter(property=OuterRef('pk'))
+    return {
+        'cover_image_url': Coalesce(Subquery(cover.values('url')), Value('')),
+        'cover_image_variants': Coalesce(
+            Subquery(cover.values('variants'), output_field=JSONField()), Value({}, output_field=JSONField())
+        ),
+        'image_count': count_per_property(ready),
+        'amenity_count': count_per_property(Amenity.objects.filter(property=OuterRef('pk'))),
+        'management_type': Coalesce(Subquery(management.values('type')[:1]), Value('')),
+    }
+
+
+def refresh_property_summaries(property_ids, **fields):
+    """
+    Recompute the summary of ``property_ids``, one UPDATE per batch.
+
+    ``fields`` are written in the same UPDATE, e.g. ``updated_at``.
+    """
+    property_ids = list(property_ids)
+    for start in range(0, len(property_ids), BATCH_SIZE):
+        Property.objects.filter(pk__in=property_ids[start:start + BATCH_SIZE]).update(
+            **summary_expressions(), **fields
+        )
+
+
+def stale_summaries(queryset):
+    """
+    Yield ``(pk, field, stored, expected)`` for every summary column of
+    ``queryset`` that disagrees with the rows it summarizes.
+    """
+    expected = {f'expected_{name}': expression for name, expression in summary_expressions().items()}
+    for row in queryset.annotate(**expected).values('pk', *Property.SUMMARY_FIELDS, *expected):
+        for name in Property.SUMMARY_FIELDS:
+            if row[name] != row[f'expected_{name}']:
+                yield row['pk'], name, row[name], row[f'expected_{name}']
@@ -0,0 +1,140 @@
+"""
+Synthetic catalogue generation for tests and benchmarks.
+
+Rows are written with ``bulk_create`` and images point at fake Cloudinary
+references, so no uploads happen and large catalogues can be built quickly.
+"""
+import random
+
+from django.conf import settings
+
+from .amenities import resolve_amenity_types
+from .cache import bump_catalogue_version
+from .geo import load_gazetteer, normalize_place
+from .models import Amenity, Management, Property, PropertyImage
+from .search import refresh_search_vectors
+from .summaries import refresh_property_summaries
+
+# Listings per neighbourhood fall off roughly like a Zipf distribution: a few
+# areas hold most of the catalogue. The multiplier scales rents by area.
+LOCATIONS = [
+    ('Kilimani', 1.2), ('Westlands', 1.4), ('Kileleshwa', 1.2), ('Lavington', 1.5), ('Karen', 1.8),
+    ('Parklands', 1.0), ('South B', 0.7), ('Ngong Road', 0.9), ('Runda', 2.0), ('Syokimau', 0.6),
+]
+LOCATION_WEIGHTS = [1 / rank for rank in range(1, len(LOCATIONS) + 1)]
+# Share of listings per bedroom count (0 is a single room).
+BEDROOM_WEIGHTS = {0: 10, 1: 25, 2: 30, 3: 20, 4: 10, 5: 5}
+# Categories a listing with that many bedrooms is advertised under.
+BEDROOM_CATEGORIES = {0: ['Single Room'], 1: ['One Bedroom', 'Apartment'], 2: ['Two Bedroom', 'Apartment']}
+LARGE_CATEGORIES = ['Three Bedroom+', 'House']
+CATEGORY_PRICE_FACTORS = {'House': 1.4}
+# Images per listing when no fixed count is given: a few have none, most 3-8.
+IMAGE_COUNT_WEIGHTS = {0: 5, 1: 5, 2: 8, 3: 12, 4: 15, 5: 15, 6: 12, 7: 10, 8: 8, 10: 6, 15: 3, 20: 1}
+MANAGEMENT_TYPE_WEIGHTS = {'Agent': 55, 'Landlord': 30, 'Owner': 15}
+# Share of listings without a management contact.
+UNMANAGED_SHARE = 0.1
+AMENITY_NAMES = [
+    'Parking', 'Gym', 'Swimming Pool', 'Backup Generator', 'Borehole',
+    'CCTV', 'Lift', 'Balcony', 'Garden', 'Servant Quarters',
+]
+MANAGER_NAMES = ['Jane Wanjiku', 'Peter Otieno', 'Mary Achieng', 'John Kamau']
+# Every generated listing's name starts with this.
+NAME_PREFIX = 'Synthetic Listing'
+
+
+def weighted_choice(rng, weights):
+    """
+    Pick a key of ``weights`` ({value: weight}) with probability proportional to its weight.
+    """
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_listing(rng, gazetteer):
+    """
+    Return an unsaved ``Property`` whose size, price and location are correlated.
+    """
+    location, price_factor = rng.choices(LOCATIONS, weights=LOCATION_WEIGHTS)[0]
+    latitude, longitude = gazetteer[normalize_place(location)]
+    bedrooms = weighted_choice(rng, BEDROOM_WEIGHTS)
+    category = rng.choice(BEDROOM_CATEGORIES.get(bedrooms, LARGE_CATEGORIES))
+    # Rents are log-normal around a base that grows with the bedroom count.
+    price = 12000 * (1 + bedrooms) * price_factor * CATEGORY_PRICE_FACTORS.get(category, 1)
+    price *= rng.lognormvariate(0, 0.35)
+    return Property(
+        category=category,
+        description='A synthetic listing generated for testing.',
+        price=min(max(round(price / 500) * 500, 5000), 2000000),
+        bedrooms=bedrooms,
+        bathrooms=max(1, bedrooms - rng.randint(0, 1)),
+        area=round(max(bedrooms, 0.5) * rng.uniform(350, 650)),
+        location=location,
+        # Scatter listings a couple of kilometres around the neighbourhood centre.
+        latitude=round(latitude + rng.uniform(-0.02, 0.02), 6),
+        longitude=round(longitude + rng.uniform(-0.02, 0.02), 6),
+    )
+
+
+def generate_properties(count, images_per_property=3, amenities_per_property=4, batch_size=1000, seed=0):
+    """
+    Create ``count`` properties, each with images, amenities and management.
+
+    ``images_per_property`` and ``amenities_per_property`` may be None to draw
+    a count per listing from a realistic distribution instead (which also
+    leaves some listings without management). Returns the list of created
+    ``Property`` instances.
+    """
+    rng = random.Random(seed)
+    management_types = [choice for choice, _ in Management.TYPE_CHOICES]
+    realistic = images_per_property is None or amenities_per_property is None
+    gazetteer = load_gazetteer(settings.PROPERTY_GAZETTEER_PATH)
+    amenity_types = list(resolve_amenity_types(AMENITY_NAMES).values())
+    created = []
+
+    for start in range(0, count, batch_size):
+        properties = []
+        for i in range(min(batch_size, count - start)):
+            prop = generate_listing(rng, gazetteer)
+            prop.name = f'{NAME_PREFIX} {start + i}'
+            prop.refresh_geohash()
+            properties.append(prop)
+        properties = Property.objects.bulk_create(properties)
+
+        images, amenities, managements = [], [], []
+        for prop in properties:
+            image_count = images_per_property
+            if image_count is None:
+                image_count = weighted_choice(rng, IMAGE_COUNT_WEIGHTS)
+            amenity_count = amenities_per_property
+            if amenity_count is None:
+                # Larger homes come with more amenities.
+                amenity_count = min(rng.randint(0, 3) + prop.bedrooms, len(amenity_types))
+            images.extend(
+                PropertyImage(property=prop, image=f'image/upload/v1/synthetic/property_{prop.pk}_{n}.jpg')
+                for n in range(image_count)
+            )
+            amenities.extend(
+                Amenity(property=prop, amenity_type=amenity_type)
+                for amenity_type in rng.sample(amenity_types, min(amenity_count, len(amenity_types)))
+            )
+            if realistic and rng.random() < UNMANAGED_SHARE:
+                continue
+            managements.append(Management(
+                property=prop,
+                name=rng.choice(MANAGER_NAMES),
+                type=weighted_choice(rng, MANAGEMENT_TYPE_WEIGHTS) if realistic else rng.choice(management_types),
+                contact=f'07{rng.randint(10000000, 99999999)}',
+                photo=f'image/upload/v1/synthetic/manager_{prop.pk}.jpg',
+            ))
+
+        for obj in images + managements:
+            obj.refresh_urls()
+        PropertyImage.objects.bulk_create(images, batch_size=batch_size)
+        Amenity.objects.bulk_create(amenities, batch_size=batch_size)
+        Management.objects.bulk_create(managements, batch_size=batch_size)
+        refresh_search_vectors(prop.pk for prop in properties)
+        refresh_property_summaries(prop.pk for prop in properties)
+        created.extend(properties)
+
+    # bulk_create sends no signals, so invalidate cached responses explicitly.
+    bump_catalogue_version()
+    return created
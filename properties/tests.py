@@ -1,3 +1,1470 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from base64 import urlsafe_b64encode
+from contextlib import closing
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import cloudinary
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import Avg, Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import geo, images, instrumentation, uploads
+from .amenities import resolve_amenity_types
+from .export import EXPORT_FORMATS
+from .models import Amenity, AmenityType, Management, Property, PropertyImage
+from .synthetic import generate_properties
+
+
+def make_property(**kwargs):
+    fields = {
+        'name': 'Garden Apartment',
+        'category': 'Apartment',
+        'description': 'Bright apartment close to town.',
+        'price': 25000,
+        'bedrooms': 2,
+        'bathrooms': 1,
+        'area': 900,
+        'location': 'Kilimani',
+    }
+    fields.update(kwargs)
+    return Property.objects.create(**fields)
+
+
+def add_amenity(prop, name):
+    amenity_type, = resolve_amenity_types([name]).values()
+    return Amenity.objects.create(property=prop, amenity_type=amenity_type)
+
+
+@override_settings(PROPERTIES_PAGE_SIZE=3, PROPERTIES_MAX_PAGE_SIZE=5)
+class PropertyPaginationTests(APITestCase):
+    url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        # Duplicate prices make sure the id tie-break keeps pages disjoint.
+        prices = [300, 100, 200, 100, 300, 100, 200, 400]
+        cls.properties = [make_property(name=f'Listing {i}', price=price) for i, price in enumerate(prices)]
+
+    def walk(self, url, link='next'):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data[link]
+        return ids
+
+    def test_pages_by_id(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(self.walk(self.url), sorted(p.id for p in self.properties))
+
+    def test_pages_by_price(self):
+        expected = [p.id for p in sorted(self.properties, key=lambda p: (p.price, p.id))]
+        self.assertEqual(self.walk(f'{self.url}?ordering=price'), expected)
+        self.assertEqual(self.walk(f'{self.url}?ordering=-price'), expected[::-1])
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get(f'{self.url}?ordering=price')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(f'{self.url}?page_size=50')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.url}?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor(self):
+        for payload in (['price', 'cheap', 1, 0], ['price', [100], 1, 0], ['price', 100, '1', 0], ['price', 1.5, 1, 0]):
+            cursor = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get(self.url, {'ordering': 'price', 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, payload)
+
+    def test_cursor_is_tied_to_its_ordering(self):
+        next_url = self.client.get(f'{self.url}?ordering=price').data['next']
+        self.assertEqual(self.client.get(next_url).status_code, 200)
+        response = self.client.get(next_url.replace('ordering=price', 'ordering=area'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_ordering(self):
+        response = self.client.get(f'{self.url}?ordering=description')
+        self.assertEqual(response.status_code, 400)
+
+
+class PropertyFilterTests(APITestCase):
+    url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.studio = make_property(name='Studio', category='Single Room', price=8000, bedrooms=0, area=300,
+                                   location='South B')
+        cls.flat = make_property(name='Flat', category='Two Bedroom', price=40000, bedrooms=2, bathrooms=2,
+                                 area=1100, location='Kilimani')
+        cls.house = make_property(name='House', category='House', price=150000, bedrooms=4, bathrooms=3,
+                                  area=3000, location='Karen')
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.data['results']]
+
+    def test_price_range(self):
+        self.assertEqual(self.names(min_price=10000, max_price=100000), ['Flat'])
+
+    def test_category(self):
+        self.assertEqual(self.names(category='House'), ['House'])
+        self.assertEqual(self.names(category='House,Single Room'), ['Studio', 'House'])
+
+    def test_minimum_rooms(self):
+        self.assertEqual(self.names(min_bedrooms=2), ['Flat', 'House'])
+        self.assertEqual(self.names(min_bathrooms=3), ['House'])
+
+    def test_area_range(self):
+        self.assertEqual(self.names(min_area=1000, max_area=2000), ['Flat'])
+
+    def test_location_substring(self):
+        self.assertEqual(self.names(location='kili'), ['Flat'])
+
+    def test_ordering(self):
+        self.assertEqual(self.names(ordering='-area'), ['House', 'Flat', 'Studio'])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'min_price': 'cheap', 'category': 'Castle'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'min_price', 'category'})
+
+    def test_out_of_range_parameters(self):
+        response = self.client.get(self.url, {'min_price': '99999999999999999999', 'max_area': '2147483648'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'min_price', 'max_area'})
+        self.assertEqual(self.client.get(self.url, {'max_price': '2147483647'}).status_code, 200)
+
+
+class PropertySearchTests(APITestCase):
+    url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kilimani = make_property(name='Kilimani Heights', bedrooms=2, location='Kilimani')
+        cls.described = make_property(name='Quiet Flat', bedrooms=2, location='Westlands',
+                                      description='Ten minutes from Kilimani.')
+        cls.karen = make_property(name='Karen Villa', category='House', bedrooms=4, location='Karen')
+        for prop in (cls.kilimani, cls.described):
+            add_amenity(prop, 'Parking')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_matches_every_term(self):
+        self.assertEqual(self.search('2 bedrooms Kilimani with parking'), [self.kilimani.pk, self.described.pk])
+        self.assertEqual(self.search('house karen'), [self.karen.pk])
+        self.assertEqual(self.search('karen parking'), [])
+
+    def test_name_and_location_rank_first(self):
+        self.assertEqual(self.search('kilimani')[0], self.kilimani.pk)
+
+    def test_combines_with_filters(self):
+        self.assertEqual(self.search('parking', location='Westlands'), [self.described.pk])
+
+    @override_settings(PROPERTIES_PAGE_SIZE=1)
+    def test_pages_by_rank(self):
+        ids, url, params = [], self.url, {'q': 'parking'}
+        while url:
+            response = self.client.get(url, params)
+            ids.extend(item['id'] for item in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(sorted(ids), [self.kilimani.pk, self.described.pk])
+
+    def test_explicit_ordering(self):
+        self.assertEqual(self.search('parking', ordering='-id'), [self.described.pk, self.kilimani.pk])
+
+    def test_rank_ordering_requires_a_search(self):
+        self.assertEqual(self.client.get(self.url, {'ordering': 'search_rank'}).status_code, 400)
+
+    def test_query_length_is_limited(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'x' * 201}).status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    @override_settings(PROPERTIES_PAGE_SIZE=2)
+    def test_pages_do_not_overlap(self):
+        expected = [
+            make_property(name=f'Garden Flat {n}', description=' '.join(['garden'] * n)).pk for n in range(1, 8)
+        ]
+        ids, url, params = [], self.url, {'q': 'garden'}
+        while url and len(ids) <= len(expected):
+            response = self.client.get(url, params)
+            ids.extend(item['id'] for item in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), expected)
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_vector_follows_amenity_changes(self):
+        add_amenity(self.karen, 'Borehole')
+        self.assertEqual(self.search('borehole'), [self.karen.pk])
+
+
+class PropertyAmenityTests(APITestCase):
+    url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.both = make_property(name='Both')
+        cls.parking = make_property(name='Parking only')
+        cls.neither = make_property(name='Neither')
+        for prop, names in ((cls.both, ['Parking', 'Gym']), (cls.parking, ['parking space'])):
+            for name in names:
+                add_amenity(prop, name)
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.data['results']]
+
+    def test_spellings_share_one_type(self):
+        self.assertEqual(AmenityType.objects.get(slug='parking').properties.count(), 2)
+        self.assertEqual(self.client.get(reverse('properties:property-detail', args=[self.parking.pk]))
+                         .data['amenities'], [{'name': 'Parking'}])
+
+    def test_all_of(self):
+        self.assertEqual(self.names(amenities='parking,GYM'), ['Both'])
+        self.assertEqual(self.names(amenities='Car park'), ['Both', 'Parking only'])
+        self.assertEqual(self.names(amenities='parking,sauna'), [])
+
+    def test_any_of(self):
+        self.assertEqual(self.names(amenities='gym,sauna', amenities_match='any'), ['Both'])
+        self.assertEqual(self.names(amenities='gymnasium,car park', amenities_match='any'), ['Both', 'Parking only'])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'amenities': 'gym', 'amenities_match': 'most'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'amenities': '!!'}).status_code, 400)
+
+    def test_renaming_a_type_updates_its_properties(self):
+        detail_url = reverse('properties:property-detail', args=[self.parking.pk])
+        etag = self.client.get(detail_url)['ETag']
+        self.client.get(self.url)
+        updated_at = Property.objects.get(pk=self.parking.pk).updated_at
+
+        amenity_type = AmenityType.objects.get(slug='parking')
+        amenity_type.name = 'Secure parking'
+        amenity_type.save()
+
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['amenities'], [{'name': 'Secure parking'}])
+        self.assertGreater(Property.objects.get(pk=self.parking.pk).updated_at, updated_at)
+        results = self.client.get(self.url).data['results']
+        self.assertEqual(results[0]['amenities'], [{'name': 'Secure parking'}, {'name': 'Gym'}])
+        self.assertCountEqual(self.names(q='secure'), ['Both', 'Parking only'])
+        self.assertEqual(Property.objects.get(pk=self.neither.pk).updated_at, self.neither.updated_at)
+
+    def test_duplicate_spellings_are_stored_once(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        detail_url = reverse('properties:property-detail', args=[self.neither.pk])
+        response = self.client.patch(detail_url, {'amenities': [{'name': 'WiFi'}, {'name': 'wi-fi'}]}, format='json')
+        self.assertEqual(response.data['amenities'], [{'name': 'Wi-Fi'}])
+        self.assertEqual(self.neither.amenities.count(), 1)
+
+
+class PropertyFacetTests(APITestCase):
+    url = reverse('properties:property-facets')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.studio = make_property(category='Single Room', price=8000, bedrooms=0)
+        cls.flat = make_property(category='Apartment', price=30000, bedrooms=2)
+        cls.house = make_property(category='House', price=300000, bedrooms=6)
+        add_amenity(cls.flat, 'Parking')
+        add_amenity(cls.house, 'Parking')
+        add_amenity(cls.house, 'Gym')
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self, facet, data):
+        return {item.get('value', item.get('slug', item.get('min_price'))): item['count'] for item in data[facet]}
+
+    def test_counts_in_two_queries(self):
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url).data
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(self.counts('category', data)['Apartment'], 1)
+        self.assertEqual(self.counts('category', data)['One Bedroom'], 0)
+        self.assertEqual(self.counts('bedrooms', data), {'0': 1, '1': 0, '2': 1, '3': 0, '4': 0, '5+': 1})
+        self.assertEqual(self.counts('price', data)[0], 1)
+        self.assertEqual(self.counts('price', data)[250000], 1)
+        self.assertEqual(data['amenities'], [{'slug': 'parking', 'name': 'Parking', 'count': 2},
+                                             {'slug': 'gym', 'name': 'Gym', 'count': 1}])
+
+    def test_counts_follow_the_filters(self):
+        data = self.client.get(self.url, {'min_price': 20000, 'amenities': 'parking'}).data
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(self.counts('category', data)['Single Room'], 0)
+        self.assertEqual(self.counts('amenities', data), {'parking': 2, 'gym': 1})
+
+    def test_cached_per_filter_signature(self):
+        self.client.get(self.url, {'category': 'House'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'category': 'House', 'cursor': 'abc', 'page_size': 5})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_amenity_write_invalidates(self):
+        self.client.get(self.url)
+        add_amenity(self.studio, 'Gym')
+        data = self.client.get(self.url).data
+        self.assertEqual(self.counts('amenities', data)['gym'], 2)
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get(self.url, {'min_price': 'cheap'}).status_code, 400)
+
+
+class PropertyExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.properties = generate_properties(25, images_per_property=2, amenities_per_property=2)
+
+    def url(self, export_format):
+        return reverse('properties:property-export', args=[export_format])
+
+    def body(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_matches_the_api_representation(self):
+        response = self.client.get(self.url('ndjson'))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [p.pk for p in self.properties])
+        detail = self.client.get(reverse('properties:property-detail', args=[self.properties[3].pk]))
+        self.assertEqual(rows[3], json.loads(detail.content))
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.body(self.client.get(self.url('csv'))))))
+        self.assertEqual(len(rows), 25)
+        first = self.properties[0]
+        self.assertEqual(rows[0]['name'], first.name)
+        self.assertEqual(rows[0]['images'].split('|'), list(first.images.values_list('url', flat=True)))
+        self.assertEqual(len(rows[0]['amenities'].split('|')), 2)
+        self.assertEqual(rows[0]['management_contact'], first.management.contact)
+
+    def test_filters_apply(self):
+        body = self.body(self.client.get(self.url('ndjson'), {'max_price': 100000}))
+        expected = Property.objects.filter(price__lte=100000).count()
+        self.assertEqual(len(body.splitlines()), expected)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(self.url('xml')).status_code, 404)
+
+    def test_csv_follows_requested_fields(self):
+        body = self.body(self.client.get(self.url('csv'), {'fields': 'id,name,management'}))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(list(rows[0]), [
+            'id', 'name', 'management_name', 'management_type', 'management_contact', 'management_photo',
+        ])
+        self.assertEqual([int(row['id']) for row in rows], [p.pk for p in self.properties])
+
+    def test_invalid_parameters_fail_before_streaming(self):
+        for export_format in EXPORT_FORMATS:
+            for params in ({'image_size': 'huge'}, {'fields': 'id,secret'}):
+                response = self.client.get(self.url(export_format), params)
+                self.assertEqual(response.status_code, 400, (export_format, params))
+                self.assertFalse(response.streaming)
+
+    @override_settings(PROPERTIES_EXPORT_CHUNK_SIZE=10)
+    def test_children_are_fetched_per_chunk(self):
+        # One streamed properties query plus images and amenities per chunk of 10.
+        with CaptureQueriesContext(connection) as queries:
+            self.body(self.client.get(self.url('ndjson')))
+        self.assertEqual(len(queries), 1 + 2 * 3)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_properties', format='csv', chunk_size=7, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 26)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    dlat, dlng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class PropertyNearTests(APITestCase):
+    url = reverse('properties:property-list-create')
+    centre = (-1.2921, 36.7856)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.here = make_property(name='Here', latitude=-1.2925, longitude=36.7860)
+        cls.close = make_property(name='Close', latitude=-1.2800, longitude=36.7900)
+        cls.far = make_property(name='Far', latitude=-1.3197, longitude=36.7073)
+        cls.unknown = make_property(name='Unknown')
+
+    def setUp(self):
+        cache.clear()
+
+    def near(self, **params):
+        response = self.client.get(self.url, {'near': '%s,%s' % self.centre, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_geohash_is_derived_on_save(self):
+        self.assertEqual(self.here.geohash, geo.encode(-1.2925, 36.7860))
+        self.assertEqual(self.unknown.geohash, '')
+        self.unknown.latitude, self.unknown.longitude = self.centre
+        self.unknown.save(update_fields=['latitude', 'longitude'])
+        self.unknown.refresh_from_db()
+        self.assertEqual(self.unknown.geohash, geo.encode(*self.centre))
+
+    def test_sorted_by_distance_within_radius(self):
+        results = self.near(radius='3')
+        self.assertEqual([item['name'] for item in results], ['Here', 'Close'])
+        self.assertAlmostEqual(results[1]['distance_km'], haversine_km(*self.centre, -1.28, 36.79), places=3)
+        self.assertEqual([item['name'] for item in self.near(radius='20')], ['Here', 'Close', 'Far'])
+
+    def test_default_radius(self):
+        with override_settings(PROPERTIES_NEAR_DEFAULT_RADIUS_KM=0.5):
+            self.assertEqual([item['name'] for item in self.near()], ['Here'])
+
+    def test_matches_an_exact_scan(self):
+        generate_properties(300)
+        for radius in (0.5, 2, 7):
+            expected = {
+                prop.pk for prop in Property.objects.exclude(latitude=None)
+                if haversine_km(*self.centre, prop.latitude, prop.longitude) <= radius
+            }
+            found = set(geo.near(Property.objects.all(), *self.centre, radius).values_list('pk', flat=True))
+            self.assertEqual(found, expected)
+
+    @override_settings(PROPERTIES_PAGE_SIZE=1)
+    def test_pages_by_distance(self):
+        names, url, params = [], self.url, {'near': '%s,%s' % self.centre, 'radius': '20'}
+        while url:
+            response = self.client.get(url, params)
+            names.extend(item['name'] for item in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(names, ['Here', 'Close', 'Far'])
+
+    def test_invalid_parameters(self):
+        for params in ({'near': 'kilimani'}, {'near': '95,36'}, {'radius': '3'},
+                       {'near': '-1.29,36.78', 'radius': '500'}, {'near': '-1.29,36.78', 'ordering': 'search_rank'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_coordinates_are_written_together(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        detail_url = reverse('properties:property-detail', args=[self.unknown.pk])
+        self.assertEqual(self.client.patch(detail_url, {'latitude': -1.3}, format='json').status_code, 400)
+        response = self.client.patch(detail_url, {'latitude': -1.3, 'longitude': 36.8}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.unknown.refresh_from_db()
+        self.assertEqual(self.unknown.geohash, geo.encode(-1.3, 36.8))
+
+    def test_geocode_command(self):
+        road = make_property(location='Kilimani Road, Nairobi')
+        nowhere = make_property(location='Somewhere else')
+        out = io.StringIO()
+        call_command('geocode_properties', stdout=out)
+        road.refresh_from_db()
+        nowhere.refresh_from_db()
+        self.assertEqual((road.latitude, road.longitude), (-1.2905, 36.7835))
+        self.assertEqual(road.geohash, geo.encode(-1.2905, 36.7835))
+        self.assertIsNone(nowhere.latitude)
+        self.assertIn("'Somewhere else'", out.getvalue())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The stand-in replica is a copy of the SQLite test database')
+class ReplicaRoutingTests(APITestCase):
+    """
+    Routes reads to a second SQLite database standing in for a replica. It
+    starts as a copy of the migrated primary, as a real replica would, and
+    then receives no replication, so whichever database answered shows in
+    the data.
+
+    The stand-in is registered before the test case resolves ``__all__``, so
+    its writes are rolled back after every test like those on the primary.
+    """
+    databases = '__all__'
+    list_url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connection.ensure_connection()
+        with closing(sqlite3.connect(cls.replica_path)) as replica:
+            connection.connection.backup(replica)
+        connections.settings['replica'] = {**connections.settings['default'], 'NAME': cls.replica_path}
+        super().setUpClass()
+        cls.enterClassContext(override_settings(DATABASE_REPLICAS=['replica']))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        cache.clear()
+        self.primary_only = make_property(name='Primary only')
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def names(self):
+        return [item['name'] for item in self.client.get(self.list_url).data['results']]
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.names(), [])
+        Property.objects.using('replica').create(
+            name='Replicated', category='House', description='', price=1, bedrooms=1, bathrooms=1, area=1,
+            location='Karen',
+        )
+        cache.clear()
+        self.assertEqual(self.names(), ['Replicated'])
+
+    def test_writes_go_to_the_primary(self):
+        self.client.force_authenticate(self.user)
+        payload = {key: value for key, value in import_row(None).items() if key != 'external_ref'}
+        self.assertEqual(self.client.post(self.list_url, payload, format='json').status_code, 201)
+        self.assertEqual(Property.objects.using('default').count(), 2)
+        self.assertEqual(Property.objects.using('replica').count(), 0)
+
+    def test_writer_reads_its_own_writes(self):
+        self.client.force_authenticate(self.user)
+        detail_url = reverse('properties:property-detail', args=[self.primary_only.pk])
+        self.client.patch(detail_url, {'price': 30000}, format='json')
+        self.assertEqual(self.names(), ['Primary only'])
+
+        # Other clients keep reading the replica.
+        self.client.force_authenticate(User.objects.create_user('other'))
+        self.assertEqual(self.names(), [])
+
+        # Once the window has passed (here: the pin is gone), so does the writer.
+        self.client.force_authenticate(self.user)
+        cache.clear()
+        self.assertEqual(self.names(), [])
+
+    def test_writer_reads_its_own_writes_from_the_async_views(self):
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        detail_url = reverse('properties:property-detail', args=[self.primary_only.pk])
+        self.assertEqual(self.client.patch(detail_url, {'price': 30000}, format='json').status_code, 200)
+        response = self.client.get(reverse('properties:property-list-async'))
+        self.assertEqual([item['name'] for item in response.json()['results']], ['Primary only'])
+        response = self.client.get(reverse('properties:property-detail-async', args=[self.primary_only.pk]))
+        self.assertEqual(response.json()['price'], 30000)
+
+        self.client.credentials()
+        response = self.client.get(reverse('properties:property-list-async'))
+        self.assertEqual(response.json()['results'], [])
+
+    def test_no_replicas_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.names(), ['Primary only'])
+
+
+class PropertyAsyncViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.garden = make_property(name='Garden Apartment', price=25000)
+        self.villa = make_property(name='Karen Villa', category='House', price=90000, location='Karen')
+        add_amenity(self.villa, 'Swimming Pool')
+        PropertyImage.objects.create(property=self.villa, image='image/upload/v1/villa.jpg')
+        Management.objects.create(property=self.villa, name='Jane', type='Agent', contact='0700000000')
+
+    def test_list_matches_the_sync_view(self):
+        for params in ({}, {'ordering': '-price', 'page_size': 1}, {'category': 'House'}, {'view': 'card'}):
+            sync = self.client.get(reverse('properties:property-list-create'), params)
+            response = self.client.get(reverse('properties:property-list-async'), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['results'], sync.json()['results'])
+
+    def test_list_paginates_with_cursors(self):
+        response = self.client.get(reverse('properties:property-list-async'), {'page_size': 1})
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Garden Apartment'])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Karen Villa'])
+        self.assertIsNone(response.json()['next'])
+
+    def test_detail_matches_the_sync_view(self):
+        sync = self.client.get(reverse('properties:property-detail', args=[self.villa.pk]))
+        response = self.client.get(reverse('properties:property-detail-async', args=[self.villa.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync.json())
+
+    def test_errors(self):
+        response = self.client.get(reverse('properties:property-detail-async', args=[0]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('properties:property-list-async'), {'min_price': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('min_price', response.json())
+        response = self.client.post(reverse('properties:property-list-async'), {})
+        self.assertEqual(response.status_code, 405)
+
+    def test_responses_are_cached(self):
+        url = reverse('properties:property-detail-async', args=[self.villa.pk])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()['name'], 'Karen Villa')
+        self.villa.name = 'Renamed Villa'
+        self.villa.save()
+        self.assertEqual(self.client.get(url).json()['name'], 'Renamed Villa')
+
+
+class PropertyResponseCacheTests(APITestCase):
+    list_url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = make_property()
+
+    def setUp(self):
+        self.detail_url = reverse('properties:property-detail', args=[self.property.pk])
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for url in (self.list_url, self.detail_url):
+            first = self.client.get(url, {'page_size': 5})
+            with self.assertNumQueries(0):
+                second = self.client.get(url, {'page_size': 5})
+            self.assertEqual(second.data, first.data)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url, {'min_price': 99999})
+        self.assertEqual(response.data['results'], [])
+
+    def test_property_write_invalidates(self):
+        self.client.get(self.detail_url)
+        Property.objects.filter(pk=self.property.pk).update(name='Stale')
+        self.assertEqual(self.client.get(self.detail_url).data['name'], 'Garden Apartment')
+
+        self.property.name = 'Renamed'
+        self.property.save()
+        self.assertEqual(self.client.get(self.detail_url).data['name'], 'Renamed')
+
+    def test_child_write_invalidates(self):
+        self.client.get(self.list_url)
+        add_amenity(self.property, 'Gym')
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['amenities'], [{'name': 'Gym'}])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_dummy_cache_disables_caching(self):
+        self.property.name = 'Renamed'
+        self.property.save()
+        self.assertEqual(self.client.get(self.detail_url).data['name'], 'Renamed')
+
+
+class SeedPropertiesCommandTests(APITestCase):
+    def test_seeds_reproducible_data(self):
+        kept = make_property()
+        call_command('seed_properties', count=5, images=1, amenities=2, seed=7, stdout=io.StringIO())
+        first = list(Property.objects.exclude(pk=kept.pk).order_by('pk').values_list('price', 'location'))
+        self.assertEqual(len(first), 5)
+
+        call_command('seed_properties', count=5, images=1, amenities=2, seed=7, replace=True, stdout=io.StringIO())
+        second = list(Property.objects.exclude(pk=kept.pk).order_by('pk').values_list('price', 'location'))
+        self.assertEqual(second, first)
+        self.assertTrue(Property.objects.filter(pk=kept.pk).exists())
+        self.assertEqual(PropertyImage.objects.count(), 5)
+
+    def test_realistic_distributions(self):
+        call_command('seed_properties', count=200, stdout=io.StringIO())
+        image_counts = set(Property.objects.annotate(n=Count('images')).values_list('n', flat=True))
+        self.assertGreater(len(image_counts), 5)
+        self.assertLess(Management.objects.count(), 200)
+        # Bigger homes cost more on average.
+        by_bedrooms = dict(Property.objects.values_list('bedrooms').annotate(Avg('price')))
+        self.assertLess(by_bedrooms[1], by_bedrooms[4])
+
+
+class BenchmarkCommandTests(APITestCase):
+    def test_writes_json_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command('benchmark', rows=20, runs=5, output=output, stdout=io.StringIO())
+            with open(output) as f:
+                report = json.load(f)
+            out = io.StringIO()
+            call_command('benchmark', rows=20, runs=5, scenario=['detail'], compare=output,
+                         output=os.path.join(directory, 'second.json'), stdout=out)
+
+        self.assertEqual(list(report['results']), ['list', 'detail', 'filtered', 'create'])
+        self.assertEqual(report['database'], connection.vendor)
+        self.assertEqual(report['results']['create']['runs'], 5)
+        self.assertLessEqual(report['results']['list']['p50_ms'], report['results']['list']['p99_ms'])
+        self.assertIn('p95 change', out.getvalue())
+        # Seeded and created rows are rolled back.
+        self.assertFalse(Property.objects.exists())
+
+
+class PropertyConditionalGetTests(APITestCase):
+    list_url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = make_property()
+
+    def setUp(self):
+        self.detail_url = reverse('properties:property-detail', args=[self.property.pk])
+
+    def test_if_none_match_returns_304(self):
+        for url in (self.list_url, self.detail_url):
+            response = self.client.get(url)
+            self.assertIn('ETag', response)
+            self.assertIn('Last-Modified', response)
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_returns_304(self):
+        response = self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_child_write_changes_validators(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        add_amenity(self.property, 'Borehole')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deletion_changes_list_validators(self):
+        other = make_property(name='Second')
+        etag = self.client.get(self.list_url)['ETag']
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_row_leaving_the_filter_changes_list_validators(self):
+        house = make_property(name='House', category='House')
+        make_property(name='Second house', category='House')
+        response = self.client.get(self.list_url, {'category': 'House'})
+        # Last-Modified has one-second resolution; move the write a minute on.
+        with mock.patch('properties.cache.time.time', return_value=time.time() + 60):
+            house.category = 'Apartment'
+            house.save()
+        response = self.client.get(
+            self.list_url, {'category': 'House'}, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Second house'])
+
+    def test_timestamps(self):
+        self.assertIsNotNone(self.property.created_at)
+        before = self.property.updated_at
+        add_amenity(self.property, 'Gym')
+        self.property.refresh_from_db()
+        self.assertGreater(self.property.updated_at, before)
+
+
+def import_row(ref, **kwargs):
+    row = {
+        'external_ref': ref,
+        'name': f'Imported {ref}',
+        'category': 'Apartment',
+        'description': 'Imported listing.',
+        'price': 30000,
+        'bedrooms': 2,
+        'bathrooms': 1,
+        'area': 800,
+        'location': 'Westlands',
+        'amenities': [{'name': 'Parking'}, {'name': 'Gym'}],
+        'management': {'name': 'Jane', 'type': 'Agent', 'contact': '0700000000'},
+    }
+    row.update(kwargs)
+    return row
+
+
+class PropertyBulkImportTests(APITestCase):
+    url = reverse('properties:property-bulk-import')
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, [import_row('a')], format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_imports_json_array(self):
+        response = self.client.post(self.url, [import_row('a'), import_row('b')], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'created': 2, 'updated': 0, 'errors': []})
+        prop = Property.objects.get(external_ref='b')
+        self.assertEqual(sorted(prop.amenities.values_list('amenity_type__name', flat=True)), ['Gym', 'Parking'])
+        self.assertEqual(prop.management.type, 'Agent')
+
+    def test_imports_ndjson(self):
+        body = '\n'.join(json.dumps(import_row(ref)) for ref in 'abc') + '\n'
+        response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['created'], 3)
+
+    def test_writes_are_batched(self):
+        rows = [import_row(str(i)) for i in range(200)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.data['created'], 200)
+        # A few INSERT batches per table and one summary UPDATE, never a statement per row.
+        self.assertLess(len(queries), 16)
+
+    def test_upsert_updates_and_replaces_children(self):
+        self.client.post(self.url, [import_row('a')], format='json')
+        row = import_row('a', price=45000, amenities=[{'name': 'Borehole'}])
+        del row['management']
+        response = self.client.post(f'{self.url}?upsert=true', [row, import_row('b')], format='json')
+        self.assertEqual(response.data, {'created': 1, 'updated': 1, 'errors': []})
+
+        prop = Property.objects.get(external_ref='a')
+        self.assertEqual(prop.price, 45000)
+        self.assertEqual(list(prop.amenities.values_list('amenity_type__name', flat=True)), ['Borehole'])
+        self.assertTrue(Management.objects.filter(property=prop).exists())
+
+    def test_existing_reference_without_upsert(self):
+        self.client.post(self.url, [import_row('a')], format='json')
+        response = self.client.post(self.url, [import_row('a')], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('external_ref', response.data['errors'][0]['errors'])
+
+    def test_invalid_rows_reject_the_import(self):
+        rows = [import_row('a'), import_row('b', price='free'), import_row('a')]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(Property.objects.exists())
+
+    def test_skip_invalid_writes_valid_rows(self):
+        rows = [import_row('a'), import_row('b', category='Castle')]
+        response = self.client.post(f'{self.url}?skip_invalid=true', rows, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 1)
+
+    def test_import_invalidates_listing_cache(self):
+        list_url = reverse('properties:property-list-create')
+        self.client.get(list_url)
+        self.client.post(self.url, [import_row('a')], format='json')
+        self.assertEqual(len(self.client.get(list_url).data['results']), 1)
+
+
+class PropertyNestedWriteTests(APITestCase):
+    list_url = reverse('properties:property-list-create')
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def detail_url(self, prop):
+        return reverse('properties:property-detail', args=[prop.pk])
+
+    def test_create_with_amenities_and_management(self):
+        payload = import_row(None)
+        del payload['external_ref']
+        response = self.client.post(self.list_url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['amenities'], [{'name': 'Parking'}, {'name': 'Gym'}])
+        self.assertEqual(response.data['management']['name'], 'Jane')
+
+    def test_update_amenities_applies_only_the_difference(self):
+        prop = make_property()
+        types = resolve_amenity_types(f'Amenity {i}' for i in range(40))
+        Amenity.objects.bulk_create(Amenity(property=prop, amenity_type=t) for t in types.values())
+        kept_ids = set(prop.amenities.exclude(amenity_type__name='Amenity 0').values_list('pk', flat=True))
+        names = [f'Amenity {i}' for i in range(1, 40)] + ['Rooftop']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                self.detail_url(prop), {'amenities': [{'name': name} for name in names]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        # Fetch, update, resolve the amenity types (creating "Rooftop"), one DELETE
+        # and one INSERT for the amenities, re-fetch for the response.
+        self.assertLess(len(queries), 18)
+        self.assertEqual(sorted(a['name'] for a in response.data['amenities']), sorted(names))
+        self.assertTrue(kept_ids <= set(prop.amenities.values_list('pk', flat=True)))
+
+    def test_update_management(self):
+        prop = make_property()
+        Management.objects.create(property=prop, name='Jane', type='Agent', contact='0700000000')
+
+        response = self.client.patch(self.detail_url(prop), {'management': {'name': 'John', 'type': 'Owner',
+                                                                              'contact': '0711111111'}}, format='json')
+        self.assertEqual(response.data['management']['name'], 'John')
+        self.assertEqual(Management.objects.get(property=prop).type, 'Owner')
+
+        response = self.client.patch(self.detail_url(prop), {'management': None}, format='json')
+        self.assertIsNone(response.data['management'])
+        self.assertFalse(Management.objects.filter(property=prop).exists())
+
+    def test_partial_management_is_validated_when_created(self):
+        prop = make_property()
+        response = self.client.patch(self.detail_url(prop), {'management': {'name': 'John'}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['management']), {'type', 'contact'})
+        self.assertFalse(Management.objects.filter(property=prop).exists())
+
+        response = self.client.patch(self.detail_url(prop), {'management': {'name': 'John', 'type': 'Owner',
+                                                                              'contact': '0711111111'}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['management']['type'], 'Owner')
+
+    def test_images_not_listed_are_removed(self):
+        prop = make_property()
+        for name in ('a', 'b'):
+            PropertyImage.objects.create(property=prop, image=f'image/upload/v1/test/{name}.jpg')
+        urls = self.client.get(self.detail_url(prop)).data['images']
+
+        response = self.client.patch(self.detail_url(prop), {'images': urls[:1]}, format='json')
+        self.assertEqual(response.data['images'], urls[:1])
+        self.assertEqual(prop.images.count(), 1)
+
+    def test_omitted_nested_fields_are_untouched(self):
+        prop = make_property()
+        add_amenity(prop, 'Gym')
+        response = self.client.patch(self.detail_url(prop), {'price': 1000}, format='json')
+        self.assertEqual(response.data['amenities'], [{'name': 'Gym'}])
+
+
+class FakeUploader:
+    def upload(self, name, content):
+        return f'image/upload/v1/fake/{name}'
+
+
+class FailingUploader:
+    def upload(self, name, content):
+        raise ConnectionError('storage unavailable')
+
+
+def png_file(name='photo.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(PROPERTY_IMAGE_UPLOADER='properties.tests.FakeUploader')
+class PropertyImageUploadTests(APITestCase):
+    list_url = reverse('properties:property-list-create')
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def create_with_images(self, count):
+        payload = {key: value for key, value in import_row(None).items() if key not in ('external_ref', 'amenities',
+                                                                                       'management')}
+        payload['uploaded_images'] = [png_file(f'photo{i}.png') for i in range(count)]
+        return self.client.post(self.list_url, payload, format='multipart')
+
+    def status_url(self, pk):
+        return reverse('properties:property-image-status', args=[pk])
+
+    def test_property_is_created_with_pending_images(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.create_with_images(3)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['images'], [])
+        self.assertEqual(len(callbacks), 1)
+
+        statuses = self.client.get(self.status_url(response.data['id'])).data
+        self.assertEqual([image['status'] for image in statuses], ['pending'] * 3)
+        self.assertEqual([image['url'] for image in statuses], [None] * 3)
+
+    @override_settings(PROPERTY_IMAGE_UPLOADS_ASYNC=False)
+    def test_inline_uploads(self):
+        response = self.create_with_images(2)
+        self.assertEqual(len(response.data['images']), 2)
+        statuses = self.client.get(self.status_url(response.data['id'])).data
+        self.assertEqual([image['status'] for image in statuses], ['ready', 'ready'])
+
+    @override_settings(PROPERTY_IMAGE_UPLOADS_ASYNC=False, PROPERTY_IMAGE_UPLOADER='properties.tests.FailingUploader')
+    def test_failed_upload_is_reported(self):
+        with self.assertLogs('properties.uploads', 'ERROR'):
+            response = self.create_with_images(1)
+        self.assertEqual(response.status_code, 201)
+        statuses = self.client.get(self.status_url(response.data['id'])).data
+        self.assertEqual(statuses[0]['status'], 'failed')
+
+    def test_status_of_unknown_property(self):
+        self.assertEqual(self.client.get(self.status_url(999)).status_code, 404)
+
+
+# The shared-cache in-memory SQLite test database has no busy timeout, so
+# queries racing an upload thread's writes fail with "table is locked": one
+# worker, and the test waits for it instead of polling.
+@override_settings(PROPERTY_IMAGE_UPLOADER='properties.tests.FakeUploader', PROPERTY_IMAGE_UPLOAD_WORKERS=1)
+@mock.patch('properties.uploads._executor', None)
+class PropertyImageBackgroundUploadTests(APITransactionTestCase):
+    def test_uploads_complete_in_the_background(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        payload = {key: value for key, value in import_row(None).items() if key not in ('external_ref', 'amenities',
+                                                                                       'management')}
+        payload['uploaded_images'] = [png_file(f'photo{i}.png') for i in range(4)]
+        response = self.client.post(reverse('properties:property-list-create'), payload, format='multipart')
+        status_url = reverse('properties:property-image-status', args=[response.data['id']])
+
+        uploads.get_executor().shutdown(wait=True)
+        statuses = [image['status'] for image in self.client.get(status_url).data]
+        self.assertEqual(statuses, ['ready'] * 4)
+
+
+class PropertyImageUrlTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = make_property()
+        cls.image = PropertyImage.objects.create(property=cls.property, image='image/upload/v1/test/front.jpg')
+        Management.objects.create(property=cls.property, name='Jane', type='Agent', contact='0700000000',
+                                  photo='image/upload/v1/test/jane.jpg')
+
+    def setUp(self):
+        self.detail_url = reverse('properties:property-detail', args=[self.property.pk])
+
+    def test_urls_are_stored_on_save(self):
+        self.assertTrue(self.image.url.endswith('/image/upload/v1/test/front.jpg'))
+        self.assertEqual(set(self.image.variants), {'thumb', 'card', 'full'})
+        self.assertIn('w_200', self.image.variants['thumb'])
+
+    def test_default_representation_uses_canonical_url(self):
+        data = self.client.get(self.detail_url).data
+        self.assertEqual(data['images'], [self.image.url])
+        self.assertTrue(data['management']['photo'].endswith('/v1/test/jane.jpg'))
+
+    def test_image_size_selects_variant(self):
+        data = self.client.get(self.detail_url, {'image_size': 'thumb'}).data
+        self.assertEqual(data['images'], [self.image.variants['thumb']])
+        self.assertIn('w_200', data['management']['photo'])
+
+    def test_unknown_image_size(self):
+        self.assertEqual(self.client.get(self.detail_url, {'image_size': 'huge'}).status_code, 400)
+
+    def test_serialization_does_not_build_urls(self):
+        with mock.patch('cloudinary.CloudinaryResource.build_url') as build_url:
+            self.client.get(self.detail_url, {'image_size': 'card'})
+        build_url.assert_not_called()
+
+
+class CloudinarySetupTests(APITestCase):
+    @mock.patch.object(images, '_configured', False)
+    def test_missing_credentials_only_fail_image_urls(self):
+        with override_settings(CLOUDINARY_STORAGE={'CLOUD_NAME': None}), \
+                mock.patch.object(cloudinary.config(), 'cloud_name', None):
+            prop = make_property()
+            with self.assertRaises(ImproperlyConfigured):
+                PropertyImage.objects.create(property=prop, image='image/upload/v1/test/front.jpg')
+
+    def test_api_settings_profile_serves_the_api(self):
+        script = (
+            'import django; django.setup(); from django.test import Client; '
+            'print(Client().get("/api/properties/?min_price=x").status_code, Client().get("/admin/").status_code)'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'core.settings_api'},
+        )
+        self.assertEqual(result.stdout.split(), ['400', '404'], result.stderr)
+
+
+class PropertyFieldsetTests(APITestCase):
+    list_url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = make_property()
+        cls.cover = PropertyImage.objects.create(property=cls.property, image='image/upload/v1/test/cover.jpg')
+        PropertyImage.objects.create(property=cls.property, image='image/upload/v1/test/back.jpg')
+        add_amenity(cls.property, 'Parking')
+
+    def setUp(self):
+        cache.clear()
+
+    def first_result(self, **params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0]
+
+    def test_fields_limits_the_output(self):
+        self.assertEqual(set(self.first_result(fields='id,name,price')), {'id', 'name', 'price'})
+
+    def test_expand_adds_relations(self):
+        result = self.first_result(fields='id,name', expand='amenities')
+        self.assertEqual(result['amenities'], [{'name': 'Parking'}])
+
+    def test_unknown_field(self):
+        response = self.client.get(self.list_url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.data['fields'])
+
+    def test_card_representation(self):
+        result = self.first_result(view='card')
+        self.assertEqual(
+            set(result), {'id', 'name', 'price', 'location', 'category', 'cover_image', 'image_count', 'amenity_count'}
+        )
+        self.assertEqual(result['cover_image'], self.cover.variants['card'])
+        self.assertEqual((result['image_count'], result['amenity_count']), (2, 1))
+
+    def test_card_can_be_expanded(self):
+        result = self.first_result(view='card', expand='amenities', image_size='thumb')
+        self.assertEqual(result['amenities'], [{'name': 'Parking'}])
+        self.assertEqual(result['cover_image'], self.cover.variants['thumb'])
+
+    def test_card_on_detail(self):
+        detail_url = reverse('properties:property-detail', args=[self.property.pk])
+        data = self.client.get(detail_url, {'view': 'card'}).data
+        self.assertNotIn('description', data)
+
+    def test_unneeded_relations_are_not_loaded(self):
+        # Validators plus the properties themselves; no joins or prefetches.
+        with CaptureQueriesContext(connection) as queries:
+            self.first_result(fields='id,name,price')
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1]['sql'])
+        self.assertNotIn('properties_management', queries[1]['sql'])
+
+    def test_card_is_read_from_the_property_table(self):
+        PropertyImage.objects.create(property=self.property, status=PropertyImage.STATUS_PENDING)
+        with CaptureQueriesContext(connection) as queries:
+            result = self.first_result(view='card')
+        # Validators plus the properties; the summary columns replace the image prefetch.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('properties_propertyimage', queries[1]['sql'])
+        self.assertEqual(result['cover_image'], self.cover.variants['card'])
+        self.assertEqual(result['image_count'], 2)
+
+
+class PropertySummaryTests(APITestCase):
+    def summary(self, prop):
+        prop.refresh_from_db()
+        return {field: getattr(prop, field) for field in Property.SUMMARY_FIELDS}
+
+    def test_child_writes_refresh_the_summary(self):
+        prop = make_property()
+        self.assertEqual(self.summary(prop)['image_count'], 0)
+        pending = PropertyImage.objects.create(property=prop, status=PropertyImage.STATUS_PENDING)
+        image = PropertyImage.objects.create(property=prop, image='image/upload/v1/test/cover.jpg')
+        add_amenity(prop, 'Parking')
+        Management.objects.create(property=prop, name='Jane', type='Agent', contact='0700000000')
+        self.assertEqual(self.summary(prop), {
+            'cover_image_url': image.url, 'cover_image_variants': image.variants,
+            'image_count': 1, 'amenity_count': 1, 'management_type': 'Agent',
+        })
+
+        image.delete()
+        pending.delete()
+        prop.management.delete()
+        self.assertEqual(self.summary(prop), {
+            'cover_image_url': '', 'cover_image_variants': {},
+            'image_count': 0, 'amenity_count': 1, 'management_type': '',
+        })
+
+    def test_admin_save_of_a_stale_instance_keeps_the_summary(self):
+        prop = make_property()
+        PropertyImage.objects.create(property=prop, image='image/upload/v1/test/cover.jpg')
+        prop.price = 30000
+        form = SimpleNamespace(changed_data=['price'])
+        admin.site.get_model_admin(Property).save_model(None, prop, form, change=True)
+        self.assertEqual(self.summary(prop)['image_count'], 1)
+        self.assertEqual(Property.objects.get(pk=prop.pk).price, 30000)
+
+    def test_copying_a_property(self):
+        prop = make_property()
+        PropertyImage.objects.create(property=prop, image='image/upload/v1/test/cover.jpg')
+        copy = Property.objects.get(pk=prop.pk)
+        copy.pk = None
+        copy.save()
+        self.assertNotEqual(copy.pk, prop.pk)
+        self.assertEqual(self.summary(copy)['image_count'], 0)
+        self.assertEqual(self.summary(prop)['image_count'], 1)
+
+    def test_saving_a_deleted_property_inserts_it_again(self):
+        prop = make_property()
+        Property.objects.filter(pk=prop.pk).delete()
+        prop.save()
+        self.assertTrue(Property.objects.filter(pk=prop.pk).exists())
+
+    def test_api_and_bulk_writes(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        payload = import_row(None)
+        del payload['external_ref']
+        response = self.client.post(reverse('properties:property-list-create'), payload, format='json')
+        created = Property.objects.get(pk=response.data['id'])
+        self.assertEqual(self.summary(created)['amenity_count'], 2)
+
+        self.client.patch(reverse('properties:property-detail', args=[created.pk]), {'management': None}, format='json')
+        self.assertEqual(self.summary(created)['management_type'], '')
+
+        self.client.post(reverse('properties:property-bulk-import'), [import_row('a')], format='json')
+        self.assertEqual(self.summary(Property.objects.get(external_ref='a'))['management_type'], 'Agent')
+
+        generate_properties(5, images_per_property=2)
+        call_command('rebuild_property_summaries', verify=True, stdout=io.StringIO())
+
+    def test_rebuild_command(self):
+        props = generate_properties(5, images_per_property=2, amenities_per_property=1)
+        Property.objects.filter(pk=props[0].pk).update(image_count=9, cover_image_url='')
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 of 5 properties have a stale summary'):
+            call_command('rebuild_property_summaries', verify=True, batch_size=2, stdout=out)
+        self.assertIn(f'Property {props[0].pk}: image_count is 9, expected 2', out.getvalue())
+
+        call_command('rebuild_property_summaries', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(self.summary(props[0])['image_count'], 2)
+        call_command('rebuild_property_summaries', verify=True, stdout=io.StringIO())
+
+
+class PropertyFastPathTests(APITestCase):
+    """
+    List and detail GETs built by properties.fastpath must be byte-identical
+    to the serializers' output.
+    """
+    list_url = reverse('properties:property-list-create')
+
+    @classmethod
+    def setUpTestData(cls):
+        # Realistic spreads: listings without images, amenities or management.
+        cls.properties = generate_properties(30, images_per_property=None, amenities_per_property=None)
+        cls.bare = make_property(name='Bare Room', latitude=None, longitude=None, virtual_tour='https://example.com/t')
+        PropertyImage.objects.create(property=cls.properties[0], status=PropertyImage.STATUS_PENDING)
+        PropertyImage.objects.create(property=cls.properties[0], status=PropertyImage.STATUS_FAILED)
+
+    def fetch(self, url, params=None, fast=True):
+        cache.clear()
+        with override_settings(PROPERTIES_FAST_READS=fast):
+            return self.client.get(url, params)
+
+    def assert_identical(self, url, params=None):
+        fast, slow = self.fetch(url, params), self.fetch(url, params, fast=False)
+        self.assertEqual(fast.status_code, slow.status_code, params)
+        self.assertEqual(fast.content, slow.content, params)
+        return fast
+
+    def test_list_variants(self):
+        near = '%s,%s' % (self.properties[0].latitude, self.properties[0].longitude)
+        for params in (
+            {}, {'page_size': 100}, {'view': 'card'}, {'view': 'card', 'expand': 'management_type,amenities'},
+            {'fields': 'id,name,images', 'image_size': 'thumb'}, {'expand': 'management', 'image_size': 'full'},
+            {'ordering': '-price', 'page_size': 7}, {'ordering': 'area'}, {'category': 'Apartment'},
+            {'amenities': 'parking,gym'}, {'near': near, 'radius': '3'}, {'location': 'nowhere'},
+            {'image_size': 'huge'}, {'fields': 'secret'},
+        ):
+            self.assert_identical(self.list_url, params)
+
+    def test_cursor_pages(self):
+        url, params = self.list_url, {'ordering': '-price', 'page_size': 8}
+        pages = 0
+        while url:
+            response = self.assert_identical(url, params)
+            url, params = response.json()['next'], None
+            pages += 1
+        self.assertEqual(pages, 4)
+
+    def test_detail_variants(self):
+        for prop in (self.properties[0], self.properties[-1], self.bare):
+            detail_url = reverse('properties:property-detail', args=[prop.pk])
+            for params in ({}, {'view': 'card'}, {'image_size': 'thumb'}, {'fields': 'id,management'}):
+                self.assert_identical(detail_url, params)
+        self.assert_identical(reverse('properties:property-detail', args=[0]))
+
+    def test_async_views(self):
+        for url, params in (
+            (reverse('properties:property-list-async'), {'page_size': 100}),
+            (reverse('properties:property-list-async'), {'view': 'card', 'ordering': '-price'}),
+            (reverse('properties:property-detail-async', args=[self.properties[0].pk]), {}),
+        ):
+            self.assert_identical(url, params)
+
+    def test_no_instances_are_built(self):
+        with mock.patch.object(Property, '__init__', side_effect=AssertionError('model instance created')):
+            response = self.fetch(self.list_url, {'page_size': 100})
+        self.assertEqual(len(response.json()['results']), 31)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_serializers', rows='20', runs=1, stdout=out)
+        self.assertIn('speedup', out.getvalue())
+        self.assertEqual(Property.objects.count(), 31)
+
+
+class PropertyQueryBudgetTests(APITestCase):
+    """
+    The list and detail endpoints must run a fixed number of queries however
+    many properties they return: one for the conditional GET validators, one
+    for properties joined to management and one per prefetched relation
+    (images, amenities).
+    """
+    list_url = reverse('properties:property-list-create')
+    list_budget = 4
+    detail_budget = 4
+
+    def assert_query_budget(self, count):
+        properties = generate_properties(count)
+
+        with override_settings(PROPERTIES_MAX_PAGE_SIZE=count):
+            with self.assertNumQueries(self.list_budget):
+                response = self.client.get(self.list_url, {'page_size': count})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), count)
+        self.assertIsNotNone(response.data['results'][-1]['management'])
+
+        detail_url = reverse('properties:property-detail', args=[properties[-1].pk])
+        with self.assertNumQueries(self.detail_budget):
+            response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_budget_with_10_properties(self):
+        self.assert_query_budget(10)
+
+    def test_budget_with_1000_properties(self):
+        self.assert_query_budget(1000)
+
+    def test_budget_with_10000_properties(self):
+        self.assert_query_budget(10000)
+
+
+class AdminQueryBudgetTests(APITestCase):
+    """
+    Admin changelists and change forms must run the same number of queries
+    however many rows, images or amenities they show.
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def count_queries(self, url, params=None):
+        # Warm up per-process caches (content types) first.
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists(self):
+        generate_properties(3)
+        property_url = reverse('admin:properties_property_changelist')
+        management_url = reverse('admin:properties_management_changelist')
+        small = [self.count_queries(property_url), self.count_queries(management_url)]
+        self.assertLessEqual(max(small), 6)
+
+        generate_properties(60, seed=1)
+        self.assertEqual([self.count_queries(property_url), self.count_queries(management_url)], small)
+        filtered = self.count_queries(property_url, {'q': 'synthetic', 'category': 'House', 'bedrooms': '2'})
+        self.assertEqual(filtered, small[0])
+
+    def test_change_forms(self):
+        few, = generate_properties(1, images_per_property=1, amenities_per_property=1)
+        many, = generate_properties(1, images_per_property=8, amenities_per_property=8, seed=1)
+        pages = [('property', few.pk, many.pk), ('management', few.management.pk, many.management.pk)]
+        for model, small, large in pages:
+            url = f'admin:properties_{model}_change'
+            small_count = self.count_queries(reverse(url, args=[small]))
+            self.assertEqual(self.count_queries(reverse(url, args=[large])), small_count, model)
+            self.assertLessEqual(small_count, 10, model)
+
+    def test_property_autocomplete(self):
+        generate_properties(3)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'properties', 'model_name': 'management', 'field_name': 'property', 'term': 'synthetic',
+        })
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_bedrooms_filter(self):
+        make_property(name='Studio', bedrooms=0)
+        make_property(name='Mansion', bedrooms=7)
+        response = self.client.get(reverse('admin:properties_property_changelist'), {'bedrooms': '5'})
+        self.assertEqual([prop.name for prop in response.context['cl'].result_list], ['Mansion'])
+
+    def test_large_counts_are_estimated(self):
+        generate_properties(3)
+        url = reverse('admin:properties_property_changelist')
+        with mock.patch('properties.admin.estimated_count', return_value=250000):
+            self.assertEqual(self.client.get(url).context['cl'].result_count, 250000)
+        with mock.patch('properties.admin.estimated_count', return_value=40):
+            self.assertEqual(self.client.get(url).context['cl'].result_count, 3)
+
+
+@override_settings(PROPERTIES_INSTRUMENTATION=True, PROPERTIES_SLOW_REQUEST_MS=60000)
+class InstrumentationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        instrumentation.registry.pending.clear()
+        make_property(name='Timed Villa')
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('properties:property-list-create'))
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertRegex(timing, r'queries;desc="[1-9]\d* queries"')
+
+    def test_metrics_endpoint(self):
+        with self.assertLogs('properties.instrumentation', 'INFO') as logs:
+            self.client.get(reverse('properties:property-list-create'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'properties:property-list-create')
+        self.assertGreater(record['queries'], 0)
+
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'properties_requests_total{status="200",view="properties:property-list-create",method="GET"} 1', body
+        )
+        self.assertIn('# TYPE properties_request_duration_seconds histogram', body)
+
+    @override_settings(PROPERTIES_METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROPERTIES_SLOW_REQUEST_MS=0, PROPERTIES_SLOW_REQUEST_SAMPLE_RATE=1)
+    def test_slow_requests_log_their_sql(self):
+        with self.assertLogs('properties.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('properties:property-list-create'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(any('properties_property' in query['sql'] for query in record['sql']))
+
+    @override_settings(PROPERTIES_INSTRUMENTATION=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('properties:property-list-create'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
@@ -0,0 +1,111 @@
+"""
+Background upload pipeline for property images.
+
+Images are saved as ``pending`` rows while the request is handled; the file
+contents are handed to a bounded thread pool once the transaction commits and
+each row is switched to ``ready`` (or ``failed``) when its upload finishes.
+The uploader is pluggable through ``PROPERTY_IMAGE_UPLOADER`` so the pipeline
+can run against local storage in development and tests.
+"""
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .images import configure_cloudinary
+from .instrumentation import timed
+from .models import PropertyImage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+class CloudinaryUploader:
+    """
+    Upload to Cloudinary and return the reference stored in ``PropertyImage.image``.
+    """
+
+    def upload(self, name, content):
+        # Imported here so workers that never upload don't load the uploader.
+        import cloudinary.uploader
+
+        configure_cloudinary()
+        with timed('cloudinary'):
+            return cloudinary.uploader.upload_resource(content, resource_type='image')
+
+
+class LocalUploader:
+    """
+    Write images under ``PROPERTY_IMAGE_LOCAL_ROOT`` instead of Cloudinary.
+    """
+
+    def upload(self, name, content):
+        root = settings.PROPERTY_IMAGE_LOCAL_ROOT
+        os.makedirs(root, exist_ok=True)
+        public_id = f'{uuid.uuid4().hex}{os.path.splitext(name)[1].lower()}'
+        with open(os.path.join(root, public_id), 'wb') as handle:
+            handle.write(content)
+        return f'image/upload/local/{public_id}'
+
+
+def get_uploader():
+    return import_string(settings.PROPERTY_IMAGE_UPLOADER)()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PROPERTY_IMAGE_UPLOAD_WORKERS,
+            thread_name_prefix='property-image-upload',
+        )
+    return _executor
+
+
+def create_pending_images(property, files):
+    """
+    Create one pending ``PropertyImage`` per uploaded file and schedule the uploads.
+    """
+    images = PropertyImage.objects.bulk_create(
+        PropertyImage(property=property, status=PropertyImage.STATUS_PENDING) for _ in files
+    )
+    # Read the files now: the request's temporary uploads are gone by the time
+    # a worker thread gets to them.
+    jobs = [(image.pk, upload.name, upload.read()) for image, upload in zip(images, files)]
+
+    if settings.PROPERTY_IMAGE_UPLOADS_ASYNC:
+        transaction.on_commit(lambda: [get_executor().submit(run_upload, *job) for job in jobs])
+    else:
+        for job in jobs:
+            process_upload(*job)
+    return images
+
+
+def run_upload(image_id, name, content):
+    try:
+        process_upload(image_id, name, content)
+    finally:
+        # Worker threads open their own connections; don't leak them.
+        connections.close_all()
+
+
+def process_upload(image_id, name, content):
+    try:
+        reference = get_uploader().upload(name, content)
+    except Exception:
+        logger.exception('Upload of property image %s failed', image_id)
+        PropertyImage.objects.filter(pk=image_id).update(status=PropertyImage.STATUS_FAILED)
+        return
+
+    image = PropertyImage.objects.filter(pk=image_id).first()
+    if image is None:
+        # Deleted while the upload was in flight.
+        return
+    image.image = reference
+    image.status = PropertyImage.STATUS_READY
+    image.save(update_fields=['image', 'status'])
@@ -1,9 +1,21 @@
 from django.urls import path
-from .views import PropertyListCreateView, PropertyDetailView
+from . import async_views
+from .views import (
+    PropertyBulkImportView, PropertyDetailView, PropertyExportView, PropertyFacetsView,
+    PropertyImageStatusView, PropertyListCreateView
+)
 
 app_name = 'properties'
 
 urlpatterns = [
     path('', PropertyListCreateView.as_view(), name='property-list-create'),
     path('<int:pk>/', PropertyDetailView.as_view(), name='property-detail'),
+    path('<int:pk>/images/', PropertyImageStatusView.as_view(), name='property-image-status'),
+    path('bulk/', PropertyBulkImportView.as_view(), name='property-bulk-import'),
+    path('facets/', PropertyFacetsView.as_view(), name='property-facets'),
+    # Not ``format``: DRF reserves that keyword for format suffixes.
+    path('export.<str:export_format>', PropertyExportView.as_view(), name='property-export'),
+    # Read-only async variants, for ASGI deployments.
+    path('async/', async_views.property_list, name='property-list-async'),
+    path('async/<int:pk>/', async_views.property_detail, name='property-detail-async'),
 ]
\ No newline at end of file
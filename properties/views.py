@@ -1,12 +1,141 @@
+from datetime import datetime, timezone as dt_timezone
+from functools import partial
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import Count, Max
 from rest_framework import generics, status
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
-from .models import Property
-from .serializers import PropertySerializer
+from .bulk import import_properties, validate_rows
+from .cache import CachedResponseMixin, get_last_catalogue_deletion, get_last_catalogue_write
+from .conditional import ConditionalGetMixin
+from .export import EXPORT_FORMATS, iter_export
+from .facets import compute_facets
+from .fastpath import property_rows, represent_properties, supports
+from .filters import FILTER_PARAMS, PropertyFilterBackend
+from .models import Property, PropertyImage
+from .pagination import PropertyCursorPagination
+from .parsers import NDJSONParser
+from .routers import ReplicaReadMixin
+from .serializers import (
+    PropertyCardSerializer, PropertyImageStatusSerializer, PropertySerializer, amenities_prefetch,
+    ready_images_prefetch
+)
+
+# Concrete Property columns a representation may need; the pagination keys
+# (id, price, area) are always loaded.
+DEFERRABLE_FIELDS = {
+    'name', 'category', 'description', 'price', 'bedrooms', 'bathrooms',
+    'area', 'location', 'latitude', 'longitude', 'virtual_tour',
+    'image_count', 'amenity_count', 'management_type',
+}
+
+
+class PropertyRepresentationMixin:
+    """
+    Pick the representation (``?view=card`` or full) for read requests and
+    load only the columns and relations that representation will output.
+    """
+    queryset = Property.objects.select_related('management').prefetch_related('images', 'amenities')
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS and self.request.query_params.get('view') == 'card':
+            return PropertyCardSerializer
+        return PropertySerializer
+
+    def get_queryset(self):
+        if self.request.method not in SAFE_METHODS:
+            return super().get_queryset()
+
+        fields = set(self.get_serializer().fields)
+        columns = {'id', 'price', 'area'} | (fields & DEFERRABLE_FIELDS)
+        queryset = Property.objects.all()
+        if 'management' in fields:
+            # select_related needs the relation itself left undeferred.
+            columns.add('management')
+            queryset = queryset.select_related('management')
+        if 'cover_image' in fields:
+            columns.update({'cover_image_url', 'cover_image_variants'})
+        queryset = queryset.only(*columns)
+        if 'images' in fields:
+            queryset = queryset.prefetch_related(ready_images_prefetch())
+        if 'amenities' in fields:
+            queryset = queryset.prefetch_related(amenities_prefetch())
+        return queryset
+
+    def get_fast_read_fields(self):
+        """
+        Return the fields of this read request if properties.fastpath can
+        build them, else None to go through the serializer.
+        """
+        if not settings.PROPERTIES_FAST_READS or self.request.method not in SAFE_METHODS:
+            return None
+        # Instantiating the serializer applies and validates ?fields= and ?expand=.
+        fields = list(self.get_serializer().fields)
+        return fields if supports(fields) else None
+
+
+class PropertyListCreateView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin,
+                             PropertyRepresentationMixin, generics.ListCreateAPIView):
+    pagination_class = PropertyCursorPagination
+    filter_backends = [PropertyFilterBackend]
+    cache_scope = 'list'
 
+    def is_search(self):
+        return bool((self.request.query_params.get('q') or '').strip())
 
-class PropertyListCreateView(generics.ListCreateAPIView):
-    queryset = Property.objects.all().prefetch_related('images', 'amenities')
-    serializer_class = PropertySerializer
+    def is_near(self):
+        return bool(self.request.query_params.get('near'))
+
+    # Read by PropertyCursorPagination: "near me" results come closest first and
+    # search results best match first; distance and rank can only be used for
+    # ordering while that filter is active.
+    @property
+    def ordering(self):
+        if self.is_near():
+            return 'distance'
+        return '-search_rank' if self.is_search() else 'id'
+
+    @property
+    def ordering_fields(self):
+        fields = ('id', 'price', 'area')
+        if self.is_search():
+            fields += ('search_rank',)
+        if self.is_near():
+            fields += ('distance',)
+        return fields
+
+    def list(self, request, *args, **kwargs):
+        handler = partial(self.cached_response, self.list_page)
+        return self.conditional_response(handler, request, *args, **kwargs)
+
+    def list_page(self, request, *args, **kwargs):
+        fields = self.get_fast_read_fields()
+        if fields is None:
+            return super().list(request, *args, **kwargs)
+        # Filter first: the filters annotate, which must happen before .values().
+        rows = property_rows(self.filter_queryset(Property.objects.all()), fields)
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(represent_properties(page, fields, self.get_serializer_context()))
+
+    def get_validators(self, request, *args, **kwargs):
+        state = self.filter_queryset(Property.objects.all()).aggregate(
+            last_modified=Max('updated_at'), count=Count('id')
+        )
+        # A row leaving the filter (re-categorised, say) lowers Max('updated_at'),
+        # so the latest catalogue write counts too.
+        last_write = get_last_catalogue_write()
+        candidates = [state['last_modified'], get_last_catalogue_deletion()]
+        if last_write is not None:
+            candidates.append(datetime.fromtimestamp(last_write, tz=dt_timezone.utc))
+        candidates = [value for value in candidates if value is not None]
+        if not candidates:
+            return None
+        return max(candidates), state['count']
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -22,6 +151,116 @@ class PropertyListCreateView(generics.ListCreateAPIView):
         )
 
 
-class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Property.objects.all().prefetch_related('images', 'amenities')
-    serializer_class = PropertySerializer
\ No newline at end of file
+class PropertyDetailView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin,
+                         PropertyRepresentationMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_scope = 'detail'
+
+    def retrieve(self, request, *args, **kwargs):
+        handler = partial(self.cached_response, self.retrieve_one)
+        return self.conditional_response(handler, request, *args, **kwargs)
+
+    def retrieve_one(self, request, *args, **kwargs):
+        fields = self.get_fast_read_fields()
+        if fields is None:
+            return super().retrieve(request, *args, **kwargs)
+        row = generics.get_object_or_404(property_rows(Property.objects.all(), fields), pk=kwargs['pk'])
+        return Response(represent_properties([row], fields, self.get_serializer_context())[0])
+
+    def get_validators(self, request, *args, **kwargs):
+        last_modified = Property.objects.filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        if last_modified is None:
+            return None
+        return last_modified, kwargs['pk']
+
+
+class PropertyImageStatusView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Upload status of every image of a property, including pending ones.
+    """
+    serializer_class = PropertyImageStatusSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return PropertyImage.objects.filter(property_id=self.kwargs['pk']).order_by('pk')
+
+    def list(self, request, *args, **kwargs):
+        if not Property.objects.filter(pk=kwargs['pk']).exists():
+            raise NotFound()
+        return super().list(request, *args, **kwargs)
+
+
+class PropertyFacetsView(ReplicaReadMixin, CachedResponseMixin, generics.GenericAPIView):
+    """
+    Counts per category, bedroom count, price band and top amenities for the
+    listings matching the listing filters.
+    """
+    queryset = Property.objects.all()
+    filter_backends = [PropertyFilterBackend]
+    pagination_class = None
+    cache_scope = 'facets'
+    # Only the filters change the counts, so e.g. ?cursor= doesn't fragment the cache.
+    cache_key_params = FILTER_PARAMS
+
+    def get(self, request, *args, **kwargs):
+        return self.cached_response(self.facets, request, *args, **kwargs)
+
+    def facets(self, request, *args, **kwargs):
+        return Response(compute_facets(self.filter_queryset(self.get_queryset())))
+
+
+class PropertyExportView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    Stream the (filtered) catalogue as NDJSON or CSV.
+    """
+    queryset = Property.objects.all()
+    filter_backends = [PropertyFilterBackend]
+    pagination_class = None
+
+    def get(self, request, export_format, *args, **kwargs):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound(f'Unknown export format. Choose from: {", ".join(EXPORT_FORMATS)}.')
+        queryset = self.filter_queryset(self.get_queryset())
+        # The rows are read after the view returns, outside the routing context;
+        # fix the database it chose now.
+        queryset = queryset.using(queryset.db)
+        response = StreamingHttpResponse(
+            iter_export(export_format, queryset, self.get_serializer_context()),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        filename = f'properties-{timezone.now():%Y%m%d}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+def query_flag(request, name):
+    return request.query_params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+class PropertyBulkImportView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    Import a JSON array (or NDJSON stream) of properties in one transaction.
+
+    ``?upsert=true`` updates properties whose ``external_ref`` already exists.
+    By default any invalid row rejects the whole import; with
+    ``?skip_invalid=true`` valid rows are written and invalid ones reported.
+    """
+    queryset = Property.objects.all()
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({'detail': 'Expected a list of properties.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.PROPERTIES_BULK_MAX_ROWS:
+            return Response(
+                {'detail': f'At most {settings.PROPERTIES_BULK_MAX_ROWS} properties can be imported at once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upsert = query_flag(request, 'upsert')
+        valid, errors = validate_rows(rows, upsert=upsert)
+        if errors and not query_flag(request, 'skip_invalid'):
+            return Response({'created': 0, 'updated': 0, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated = import_properties(valid, upsert=upsert)
+        return Response({'created': created, 'updated': updated, 'errors': errors})
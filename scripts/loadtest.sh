@@ -0,0 +1,48 @@
+#!/usr/bin/env bash
+# Load benchmark of the property listing under different gunicorn settings.
+#
+# Usage: scripts/loadtest.sh ["ENV=value ..." ...]
+#
+# Each argument is one gunicorn configuration, given as gunicorn.conf.py
+# environment overrides, e.g.
+#   scripts/loadtest.sh "WEB_CONCURRENCY=2" "WEB_CONCURRENCY=2 GUNICORN_THREADS=4"
+# Without DATABASE_URL a throwaway SQLite database is used. ROWS, SEED,
+# CONCURRENCY, DURATION, URL_PATH and PORT tune the run; the response cache
+# is off (CACHE_URL=dummy://) unless CACHE_URL is set.
+set -o errexit -o nounset -o pipefail
+cd "$(dirname "$0")/.."
+
+ROWS=${ROWS:-5000}
+SEED=${SEED:-0}
+CONCURRENCY=${CONCURRENCY:-10,50,100}
+DURATION=${DURATION:-10}
+URL_PATH=${URL_PATH:-/api/properties/}
+PORT=${PORT:-8765}
+export CACHE_URL=${CACHE_URL:-dummy://}
+if [ -z "${DATABASE_URL:-}" ]; then
+    export DATABASE_URL="sqlite:///$(mktemp -d)/loadtest.sqlite3"
+fi
+
+python manage.py migrate --no-input --verbosity 0
+python manage.py seed_properties --count "$ROWS" --seed "$SEED" --replace
+
+if [ $# -eq 0 ]; then
+    set -- "GUNICORN_WORKER_CLASS=sync" "GUNICORN_WORKER_CLASS=gthread GUNICORN_THREADS=4"
+fi
+
+url="http://127.0.0.1:$PORT$URL_PATH"
+for config in "$@"; do
+    echo
+    echo "== $config"
+    # shellcheck disable=SC2086
+    env $config gunicorn core.wsgi:application -c gunicorn.conf.py -b "127.0.0.1:$PORT" --log-level warning &
+    server=$!
+    for _ in $(seq 60); do
+        curl --silent --fail --output /dev/null "$url" && break
+        kill -0 "$server" 2>/dev/null || { echo "gunicorn exited" >&2; exit 1; }
+        sleep 0.5
+    done
+    python manage.py loadtest --target "gunicorn=$url" --concurrency "$CONCURRENCY" --duration "$DURATION" || true
+    kill "$server"
+    wait "$server" || true
+done
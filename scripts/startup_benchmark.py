@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Compare worker cold start between settings profiles.
+
+Each profile is booted several times in a fresh interpreter under
+``python -X importtime``: the WSGI application is loaded and the URLconf
+resolved, which is what a preloaded gunicorn master plus its first request
+import. Reports wall time, total import time, peak RSS and the slowest
+top-level imports.
+
+    python scripts/startup_benchmark.py                       # core.settings vs core.settings_api
+    python scripts/startup_benchmark.py core.settings_api --runs 10 --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BOOT = (
+    'from django.core.wsgi import get_wsgi_application; get_wsgi_application(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+# "import time: <self us> | <cumulative us> | <indented module name>"
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def boot(settings_module):
+    """
+    Boot Django once; return ``(wall seconds, max RSS in MiB, importtime lines)``.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        sys.exit(f'{settings_module} failed to boot:\n{stderr}')
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return elapsed, rss, stderr.splitlines()
+
+
+def top_level_imports(lines):
+    """
+    Return ``{module: cumulative microseconds}`` for the top-level imports.
+    """
+    imports = {}
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports[match.group(4)] = int(match.group(2))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('profiles', nargs='*', default=['core.settings', 'core.settings_api'])
+    parser.add_argument('--runs', type=int, default=5, help='Boots per profile (the median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest top-level imports to list')
+    args = parser.parse_args()
+
+    print(f"{'profile':<24}{'wall':>10}{'imports':>11}{'max RSS':>12}")
+    slowest = {}
+    for profile in args.profiles:
+        boots = [boot(profile) for _ in range(args.runs)]
+        imports = [top_level_imports(lines) for _, _, lines in boots]
+        import_ms = statistics.median(sum(run.values()) for run in imports) / 1000
+        wall_ms = statistics.median(elapsed for elapsed, _, _ in boots) * 1000
+        rss = statistics.median(rss for _, rss, _ in boots)
+        print(f'{profile:<24}{wall_ms:>8.0f}ms{import_ms:>9.0f}ms{rss:>8.1f} MiB')
+        slowest[profile] = sorted(imports[-1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    for profile, modules in slowest.items():
+        print(f'\nSlowest top-level imports, {profile}:')
+        for module, micros in modules:
+            print(f'  {micros / 1000:>8.1f}ms  {module}')
+
+
+if __name__ == '__main__':
+    main()